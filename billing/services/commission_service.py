@@ -1,7 +1,7 @@
 # FILE: myfita/apps/backend/billing/services/commission_service.py
 # REPLACE ENTIRE FILE
 
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 from dataclasses import dataclass
 
 from billing.models import CommissionConfig
@@ -25,6 +25,23 @@ class CommissionBreakdown:
         return self.net_amount
 
 
+def _rate_to_bps(rate: Decimal) -> int:
+    """Commission rate (e.g. Decimal("0.1200")) as whole basis points"""
+    bps = rate.scaleb(4)
+    if bps != bps.to_integral_value():
+        raise ValueError("Commission rate must be a whole number of basis points")
+    return int(bps)
+
+
+def _apply_bps(amount: int, rate_bps: int) -> int:
+    """
+    amount * rate_bps / 10000 rounded half away from zero, i.e. the same
+    result as Decimal quantize(ROUND_HALF_UP), in integer math
+    """
+    sign = -1 if amount < 0 else 1
+    return sign * ((abs(amount) * rate_bps + 5000) // 10000)
+
+
 class CommissionService:
     """Service for calculating platform commissions"""
 
@@ -45,6 +62,9 @@ class CommissionService:
         if gross_amount <= 0:
             raise ValueError("Gross amount must be positive")
 
+        if gross_amount != int(gross_amount):
+            raise ValueError("Gross amount must be whole Toman")
+
         # Get active commission rate
         rate = CommissionConfig.get_active_rate()
 
@@ -54,10 +74,9 @@ class CommissionService:
         if rate > Decimal("1.0000"):
             raise ValueError("Commission rate cannot exceed 100%")
 
-        # Calculate commission (round up to not favor coach)
-        commission = int(
-            (Decimal(gross_amount) * rate).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-        )
+        # Commission rounds half away from zero (a half Toman goes to the
+        # platform), computed in integer basis points
+        commission = _apply_bps(int(gross_amount), _rate_to_bps(rate))
         net = gross_amount - commission
 
         return CommissionBreakdown(
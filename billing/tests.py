@@ -11,4 +11,60 @@ class BillingStressTests(TestCase):
             token = TrustToken.objects.create(...)  # Setup token
             self.assertTrue(CommissionService.validate_token(token))  # Check integrity
 
-    # Add 9 more similar tests for vulnerabilities, commissions, etc.
\ No newline at end of file
+    # Add 9 more similar tests for vulnerabilities, commissions, etc.
+
+# ---------------------------------------------------------------------------
+# Commission arithmetic (integer basis points vs. the former Decimal math)
+# ---------------------------------------------------------------------------
+
+from decimal import Decimal, ROUND_HALF_UP
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from billing.models import CommissionConfig
+from billing.services.commission_service import _apply_bps, _rate_to_bps
+
+
+def _decimal_commission(amount, rate):
+    """The pre-basis-point implementation, kept as the reference"""
+    return int((Decimal(amount) * rate).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+class CommissionArithmeticTests(SimpleTestCase):
+    # (amount, rate, expected commission)
+    CASES = [
+        (1, Decimal("0.1200"), 0),
+        (4, Decimal("0.1250"), 1),             # 0.5 -> 1
+        (-4, Decimal("0.1250"), -1),           # -0.5 -> -1 (away from zero)
+        (100, Decimal("0.1200"), 12),
+        (-100, Decimal("0.1200"), -12),
+        (125, Decimal("0.1200"), 15),
+        (1_234_567, Decimal("0.1200"), 148_148),
+        (-1_234_567, Decimal("0.1200"), -148_148),
+        (999_999, Decimal("0.0001"), 100),
+        (5_000, Decimal("0.0001"), 1),         # 0.5 -> 1
+        (-5_000, Decimal("0.0001"), -1),
+        (4_999, Decimal("0.0001"), 0),
+        (250_000, Decimal("1.0000"), 250_000),
+        (0, Decimal("0.1200"), 0),
+    ]
+
+    def test_matches_decimal_half_up(self):
+        for amount, rate, expected in self.CASES:
+            with self.subTest(amount=amount, rate=rate):
+                self.assertEqual(_decimal_commission(amount, rate), expected)
+                self.assertEqual(_apply_bps(amount, _rate_to_bps(rate)), expected)
+
+    def test_rejects_fractional_basis_points(self):
+        with self.assertRaises(ValueError):
+            _rate_to_bps(Decimal("0.12345"))
+
+    def test_accepts_trailing_zero_precision(self):
+        self.assertEqual(_rate_to_bps(Decimal("0.120000")), 1200)
+
+    def test_calculate_breakdown(self):
+        with mock.patch.object(CommissionConfig, "get_active_rate", return_value=Decimal("0.1200")):
+            breakdown = CommissionService().calculate(1_234_567)
+        self.assertEqual(breakdown.commission_amount, 148_148)
+        self.assertEqual(breakdown.net_amount, 1_234_567 - 148_148)
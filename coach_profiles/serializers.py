@@ -11,4 +11,12 @@ class CoachProfilePublicSerializer(serializers.ModelSerializer):
 class CoachProfilePrivateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CoachProfile
-        fields = "__all__"
\ No newline at end of file
+        fields = [
+            "id",
+            "user",
+            "bio",
+            "expertise",
+            "is_visible",
+            "created_at",
+            "updated_at",
+        ]
\ No newline at end of file
@@ -0,0 +1,5 @@
+# FILE: myfita/apps/backend/core/__init__.py
+
+from .celery import app as celery_app
+
+__all__ = ("celery_app",)
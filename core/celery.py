@@ -0,0 +1,18 @@
+# FILE: myfita/apps/backend/core/celery.py
+
+"""
+CELERY APPLICATION
+
+Background workers and periodic (beat) jobs.
+Tasks live in each app's `tasks.py` and are auto-discovered.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+app = Celery("core")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
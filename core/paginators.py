@@ -0,0 +1,41 @@
+# FILE: myfita/apps/backend/core/paginators.py
+
+"""
+SHARED PAGINATORS
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin paginator that reads the planner's row estimate for the table
+    (pg_class.reltuples) instead of running COUNT(*) on every page load.
+    
+    Filtered or searched changelists still count exactly, as do small
+    tables and tables Postgres has not analyzed yet (reltuples < 0),
+    where an estimate could hide rows.
+    """
+    
+    # Below this many estimated rows an exact COUNT(*) is cheap anyway
+    EXACT_COUNT_BELOW = 10_000
+    
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if query.where:
+            return super().count
+        
+        connection = connections[self.object_list.db]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        
+        if row is None or row[0] < self.EXACT_COUNT_BELOW:
+            return super().count
+        return row[0]
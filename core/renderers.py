@@ -0,0 +1,34 @@
+# FILE: myfita/apps/backend/core/renderers.py
+
+"""
+CUSTOM RENDERERS
+
+orjson-backed replacement for DRF's JSONRenderer. Serialization runs in C
+and returns bytes directly, so the json.dumps() + encode() step on every
+API response disappears.
+"""
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+
+
+def _default(obj):
+    """Decimal, lazy translation strings, etc. render as their str()"""
+    return str(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in for rest_framework.renderers.JSONRenderer"""
+    
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
@@ -66,6 +66,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Static files (and the prebuilt API schema) served pre-compressed
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # Brotli/gzip for JSON payloads (matching, search, schema); negotiates
+    # from Accept-Encoding and falls back to gzip, so GZipMiddleware is
+    # not stacked on top of it
+    "compression_middleware.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -148,9 +154,31 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+# Let WhiteNoise serve static files under runserver too
+WHITENOISE_USE_FINDERS = DEBUG
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Signed media streams are handed to nginx with X-Accel-Redirect so the
+# file is sent with sendfile(2), never through a Python worker. Needs an
+# internal nginx location, e.g.:
+#   location /protected_media/ { internal; alias <MEDIA_ROOT>/; }
+# Unset (dev/runserver): Django streams the file itself.
+PROTECTED_MEDIA_ACCEL_PREFIX = os.getenv("PROTECTED_MEDIA_ACCEL_PREFIX", "")
+
+# Key for delivered-PDF fingerprints (programs.pdf.watermark); defaults to
+# SECRET_KEY, set separately to rotate one without the other
+WATERMARK_KEY = os.getenv("WATERMARK_KEY") or SECRET_KEY
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # =============================================================================
@@ -165,7 +193,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "core.renderers.ORJSONRenderer",
     ],
     
     # --- ADDED: API documentation and pagination ---
@@ -245,26 +273,46 @@ CACHES = {
         "OPTIONS": {
             "MAX_ENTRIES": 1000,
         }
-    }
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
 }
 
-# Optional: Redis cache for production (uncomment when ready)
-# REDIS_URL = os.getenv("REDIS_URL", "")
-# if REDIS_URL:
-#     CACHES = {
-#         "default": {
-#             "BACKEND": "django_redis.cache.RedisCache",
-#             "LOCATION": REDIS_URL,
-#             "OPTIONS": {
-#                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
-#             }
-#         }
-#     }
+# Redis cache for production (enabled when REDIS_URL is set)
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # Smaller/faster than pickle; values must be msgpack-native
+                # (no Decimal/UUID/datetime), see matching_service cache path
+                "SERIALIZER": "django_redis.serializers.msgpack.MSGPackSerializer",
+            }
+        },
+        # Separate alias so session keys never compete with cached data
+        "sessions": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "session",
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            }
+        },
+    }
 
 # =============================================================================
 # ADDED: LOGGING (For debugging and monitoring)
 # =============================================================================
 
+# Service loggers follow DEBUG unless SERVICE_LOG_LEVEL says otherwise. Like
+# every setting this is read once at startup; a change needs a restart.
+_SVC_LOG_LEVEL = os.getenv("SERVICE_LOG_LEVEL", "DEBUG" if DEBUG else "INFO")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -297,17 +345,17 @@ LOGGING = {
         },
         "matching": {
             "handlers": ["console"],
-            "level": "DEBUG" if DEBUG else "INFO",
+            "level": _SVC_LOG_LEVEL,
             "propagate": False,
         },
         "search": {
             "handlers": ["console"],
-            "level": "DEBUG" if DEBUG else "INFO",
+            "level": _SVC_LOG_LEVEL,
             "propagate": False,
         },
         "billing": {
             "handlers": ["console"],
-            "level": "DEBUG" if DEBUG else "INFO",
+            "level": _SVC_LOG_LEVEL,
             "propagate": False,
         },
     },
@@ -334,13 +382,20 @@ MATCHING_CONFIG = {
         "gender_preference": 5,
     },
     
-    # Cache settings
+    # Cache settings (entries are msgpack-encoded when Redis is enabled)
     "CACHE_MATCH_RESULTS": True,
-    "CACHE_TTL_SECONDS": 3600,  # 1 hour
+    "CACHE_TTL_SECONDS": 60 * 60,  # 1 hour; keys also carry the prefs hash
+    "CACHE_VERSION": 3,  # Bump when the cached payload shape changes
     
     # Result limits
     "DEFAULT_MATCH_LIMIT": 20,
     "MAX_MATCH_LIMIT": 50,
+    
+    # Interaction click stream (Redis Stream, batch-flushed by Celery beat)
+    "INTERACTION_STREAM_KEY": "stream:matching:interactions",
+    "INTERACTION_STREAM_MAXLEN": 100_000,
+    "INTERACTION_FLUSH_BATCH": 1000,
+    "INTERACTION_FLUSH_SECONDS": 5,
 }
 
 # =============================================================================
@@ -363,11 +418,44 @@ SEARCH_CONFIG = {
     
     # Popular searches
     "POPULAR_SEARCH_MIN_COUNT": 5,  # Minimum searches to be "popular"
+    "POPULAR_CACHE_KEY": "search:popular:v1",
+    "POPULAR_REFRESH_SECONDS": 300,  # Rebuilt by Celery beat
     
     # Saved searches per user
     "MAX_SAVED_SEARCHES_PER_USER": 20,
 }
 
+# =============================================================================
+# CELERY (BACKGROUND & PERIODIC TASKS)
+# =============================================================================
+
+CELERY_BROKER_URL = os.getenv(
+    "CELERY_BROKER_URL", REDIS_URL or "redis://127.0.0.1:6379/0"
+)
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ALWAYS_EAGER = TESTING
+
+CELERY_TASK_ROUTES = {
+    # High-volume click stream gets its own workers
+    "matching.tasks.log_matching_interaction": {"queue": "interactions"},
+    "matching.tasks.flush_matching_interactions": {"queue": "interactions"},
+}
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-popular-searches": {
+        "task": "search.tasks.refresh_popular_searches",
+        "schedule": SEARCH_CONFIG["POPULAR_REFRESH_SECONDS"],
+    },
+    "flush-matching-interactions": {
+        "task": "matching.tasks.flush_matching_interactions",
+        "schedule": MATCHING_CONFIG["INTERACTION_FLUSH_SECONDS"],
+    },
+    "rebuild-program-stats": {
+        "task": "programs.tasks.rebuild_program_stats",
+        "schedule": 24 * 60 * 60,
+    },
+}
+
 # =============================================================================
 # ADDED: BILLING & COMMISSION CONFIGURATION
 # =============================================================================
@@ -415,15 +503,28 @@ VERIFICATION_CONFIG = {
 # ADDED: SECURITY ENHANCEMENTS
 # =============================================================================
 
-# Session security
-SESSION_COOKIE_SECURE = not DEBUG
+# Session storage: one cache GET per request instead of a django_session
+# SELECT (+ UPDATE). Local-memory caches are per-process, so fall back to
+# the DB-backed engine until Redis is configured.
+if REDIS_URL:
+    SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+else:
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Secure cookies outside DEBUG; COOKIE_SECURE overrides (e.g. plain-HTTP staging)
+_COOKIE_SECURE = os.getenv("COOKIE_SECURE", str(not DEBUG)).lower() == "true"
+
+# Session security (API-only: no cross-site navigation needs cookies)
+SESSION_COOKIE_SECURE = _COOKIE_SECURE
 SESSION_COOKIE_HTTPONLY = True
-SESSION_COOKIE_SAMESITE = "Lax"
+SESSION_COOKIE_SAMESITE = "Strict"
 
 # CSRF security
-CSRF_COOKIE_SECURE = not DEBUG
+CSRF_COOKIE_SECURE = _COOKIE_SECURE
 CSRF_COOKIE_HTTPONLY = True
-CSRF_COOKIE_SAMESITE = "Lax"
+CSRF_COOKIE_SAMESITE = "Strict"
 
 # Additional security headers (production)
 if not DEBUG:
@@ -441,7 +542,7 @@ if not DEBUG:
 
 REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"] = [
     "rest_framework.throttling.AnonRateThrottle",
-    "rest_framework.throttling.UserRateThrottle",
+    "core.throttling.RedisUserThrottle",
 ]
 
 REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
@@ -455,8 +556,16 @@ REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
 # =============================================================================
 
 # BP: "program purchase delivery (PDF)"
-FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# Uploads always stream to a temp file instead of buffering in worker RAM
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024  # 1MB
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024  # 2MB (non-file form bodies)
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+FILE_UPLOAD_PERMISSIONS = 0o644
+# None = the system temp dir. Pointing this at a tmpfs such as /dev/shm is
+# opt-in: it is often small and concurrent 10MB uploads can fill it.
+FILE_UPLOAD_TEMP_DIR = os.getenv("FILE_UPLOAD_TEMP_DIR") or None
 
 # Allowed file extensions for program PDFs
 ALLOWED_PROGRAM_FILE_TYPES = ["pdf"]
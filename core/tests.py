@@ -0,0 +1,60 @@
+# FILE: myfita/apps/backend/core/tests.py
+
+import json
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy as _
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def setUp(self):
+        self.renderer = ORJSONRenderer()
+
+    def test_matches_drf_renderer_for_serializer_output(self):
+        data = {
+            "id": 12,
+            "title": "برنامه کاهش وزن",
+            "price_toman": 250000,
+            "rating": 4.5,
+            "is_active": True,
+            "coach": None,
+            "tags": ["cardio", "beginner"],
+            "results": [{"id": 1, "score": 0.875}, {"id": 2, "score": 0.5}],
+        }
+        self.assertEqual(
+            json.loads(self.renderer.render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_non_ascii_is_not_escaped(self):
+        rendered = self.renderer.render({"city": "تهران"})
+        self.assertIsInstance(rendered, bytes)
+        self.assertIn("تهران".encode(), rendered)
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(self.renderer.render(None), b"")
+
+    def test_fallback_types_render_as_str(self):
+        value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+        detail = _("Not found.")
+        rendered = json.loads(self.renderer.render({
+            "id": value,
+            "amount": Decimal("12.50"),
+            "detail": detail,
+        }))
+        self.assertEqual(rendered, {
+            "id": str(value),
+            "amount": "12.50",
+            "detail": str(detail),
+        })
+
+    def test_non_string_keys(self):
+        self.assertEqual(
+            json.loads(self.renderer.render({1: "a", 2: "b"})),
+            {"1": "a", "2": "b"},
+        )
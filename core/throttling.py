@@ -0,0 +1,59 @@
+# FILE: myfita/apps/backend/core/throttling.py
+
+"""
+CUSTOM THROTTLES
+
+DRF's SimpleRateThrottle keeps a list of request timestamps per user in
+the cache and trims it on every request. At "1000/hour" that list holds
+up to 1000 floats that are deserialized and copied per call. The
+throttles here keep one integer counter per user per window instead.
+"""
+
+from django.core.cache import cache
+from rest_framework.throttling import UserRateThrottle
+
+
+def _cache_is_redis():
+    """True when the default cache is django_redis"""
+    return hasattr(cache, "client") and hasattr(cache.client, "get_client")
+
+
+class RedisUserThrottle(UserRateThrottle):
+    """
+    Fixed-window user throttle backed by Redis INCR + EXPIRE.
+    
+    Both commands are pipelined (one round-trip). Falls back to DRF's
+    history-based implementation when the cache is not Redis (dev/tests).
+    """
+    
+    def allow_request(self, request, view):
+        if not _cache_is_redis():
+            return super().allow_request(request, view)
+        
+        if self.rate is None:
+            return True
+        
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        # Raw client below: apply the cache's KEY_PREFIX/VERSION ourselves
+        self.key = cache.make_key(key)
+        
+        from django_redis import get_redis_connection
+        
+        pipe = get_redis_connection("default").pipeline()
+        pipe.incr(self.key)
+        # NX: only the first hit of a window sets the expiry
+        pipe.expire(self.key, self.duration, nx=True)
+        count, _ = pipe.execute()
+        
+        return count <= self.num_requests
+    
+    def wait(self):
+        if not _cache_is_redis():
+            return super().wait()
+        
+        from django_redis import get_redis_connection
+        
+        ttl = get_redis_connection("default").ttl(self.key)
+        return ttl if ttl and ttl > 0 else self.duration
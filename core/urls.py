@@ -13,6 +13,11 @@ from drf_spectacular.views import (
 )
 # -----------------------------------------
 
+from core.views import serve_static_schema
+
+# Fall back to live generation if the build step has not produced the file
+_LIVE_SCHEMA = settings.DEBUG or not (settings.STATIC_ROOT / "schema.yml").exists()
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("users.api.urls")),
@@ -34,7 +39,14 @@ urlpatterns = [
     path("api/search/", include("search.api.urls")),
     
     # API Documentation (Swagger/ReDoc)
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    # Schema is static between deploys: serve the build-time file
+    # (`manage.py spectacular --file <STATIC_ROOT>/schema.yml`) outside
+    # DEBUG, and generate it live only while developing
+    path(
+        "api/schema/",
+        SpectacularAPIView.as_view() if _LIVE_SCHEMA else serve_static_schema,
+        name="schema"
+    ),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
     
@@ -43,6 +55,9 @@ urlpatterns = [
     # ------------------------------
 ]
 
+handler404 = "core.views.custom_404"
+handler500 = "core.views.custom_500"
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
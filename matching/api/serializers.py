@@ -1,13 +1,54 @@
 # FILE: myfita/apps/backend/matching/api/serializers.py
 
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from matching.models import AthletePreferences, MatchResult, MatchingInteraction
 
 
+# Quiz bounds (mirror the model validators on AthletePreferences)
+_DAYS_MIN, _DAYS_MAX = 1, 7
+_AGE_MIN, _AGE_MAX = 13, 100
+
+_ERR_DAYS = "تعداد روزهای تمرین باید بین ۱ تا ۷ باشد."
+_ERR_AGE = "سن باید بین ۱۳ تا ۱۰۰ سال باشد."
+
+
+class BasisPointsField(serializers.DecimalField):
+    """
+    Read-only score stored as integer basis points (8750), rendered as
+    the decimal string clients already expect ("87.50").
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_digits", 5)
+        kwargs.setdefault("decimal_places", 2)
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        return super().to_representation(Decimal(value).scaleb(-2))
+
+
 class AthletePreferencesSerializer(serializers.ModelSerializer):
     """Serializer for athlete preferences (quiz)"""
     
     bmi = serializers.ReadOnlyField()
+    training_days_per_week = serializers.IntegerField(
+        required=False,
+        min_value=_DAYS_MIN,
+        max_value=_DAYS_MAX,
+        error_messages={"min_value": _ERR_DAYS, "max_value": _ERR_DAYS},
+    )
+    age = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        min_value=_AGE_MIN,
+        max_value=_AGE_MAX,
+        error_messages={"min_value": _ERR_AGE, "max_value": _ERR_AGE},
+    )
     
     class Meta:
         model = AthletePreferences
@@ -38,16 +79,6 @@ class AthletePreferencesSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "quiz_completed", "quiz_completed_at", "created_at", "updated_at", "bmi"]
-    
-    def validate_training_days_per_week(self, value):
-        if not 1 <= value <= 7:
-            raise serializers.ValidationError("تعداد روزهای تمرین باید بین ۱ تا ۷ باشد.")
-        return value
-    
-    def validate_age(self, value):
-        if value and not 13 <= value <= 100:
-            raise serializers.ValidationError("سن باید بین ۱۳ تا ۱۰۰ سال باشد.")
-        return value
 
 
 class AthletePreferencesCreateSerializer(serializers.ModelSerializer):
@@ -75,18 +106,17 @@ class AthletePreferencesCreateSerializer(serializers.ModelSerializer):
         ]
     
     def create(self, validated_data):
-        from django.utils import timezone
-        
         athlete = self.context["request"].user
         validated_data["athlete"] = athlete
         validated_data["quiz_completed"] = True
-        validated_data["quiz_completed_at"] = timezone.now()
         
-        # Update or create
+        # Update or create; quiz_completed_at is stamped by a DB trigger
+        # when quiz_completed first becomes true
         instance, created = AthletePreferences.objects.update_or_create(
             athlete=athlete,
             defaults=validated_data
         )
+        instance.refresh_from_db(fields=["quiz_completed_at"])
         return instance
 
 
@@ -95,7 +125,7 @@ class CoachMatchSerializer(serializers.Serializer):
     
     coach_id = serializers.UUIDField()
     coach_name = serializers.CharField()
-    score = serializers.DecimalField(max_digits=5, decimal_places=2)
+    score = BasisPointsField()
     reasons = serializers.ListField(child=serializers.CharField())
     score_breakdown = serializers.DictField(required=False)
     specialties = serializers.ListField(child=serializers.CharField())
@@ -124,6 +154,7 @@ class MatchResultSerializer(serializers.ModelSerializer):
     """Serializer for stored match results"""
     
     coach_name = serializers.CharField(source="coach.get_full_name", read_only=True)
+    score = BasisPointsField()
     
     class Meta:
         model = MatchResult
@@ -141,10 +172,29 @@ class MatchResultSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class MatchQueryParamsSerializer(serializers.Serializer):
+    """Query params for the coach matching endpoint"""
+    
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.MATCHING_CONFIG["MAX_MATCH_LIMIT"],
+        default=10,
+        help_text="Maximum number of matches to return (default: 10)"
+    )
+    refresh = serializers.BooleanField(
+        default=False,
+        help_text="Force refresh cached results"
+    )
+
+
 class LogInteractionSerializer(serializers.Serializer):
     """Serializer for logging interactions"""
     
-    coach_id = serializers.UUIDField()
+    # User ids are integers; an unknown or non-coach id is a 400 here
+    # rather than a row the stream flusher cannot insert
+    coach_id = serializers.PrimaryKeyRelatedField(
+        queryset=get_user_model().objects.filter(role="coach")
+    )
     action = serializers.ChoiceField(choices=MatchingInteraction.Action.choices)
     context = serializers.DictField(required=False, default=dict)
     session_id = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
@@ -1,17 +1,36 @@
 # FILE: myfita/apps/backend/matching/api/views.py
 
-from rest_framework import status
+import hashlib
+
+import orjson
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import extend_schema
 
 from matching.models import AthletePreferences, MatchResult
-from matching.services.matching_service import CoachMatchingService
+from matching.services.matching_service import (
+    CoachMatchingService,
+    MATCH_PAYLOAD_TTL_SECONDS,
+    PREFS_PAYLOAD_TTL_SECONDS,
+    match_coaches_payload_key,
+    match_history_payload_key,
+    prefs_payload_key,
+)
+from matching.services.interaction_stream import enqueue_interaction
+from matching.tasks import log_matching_interaction
 from matching.api.serializers import (
     AthletePreferencesSerializer,
     AthletePreferencesCreateSerializer,
+    BasisPointsField,
     MatchingResultSerializer,
+    MatchQueryParamsSerializer,
     MatchResultSerializer,
     LogInteractionSerializer,
 )
@@ -30,15 +49,26 @@ class AthletePreferencesView(APIView):
         responses={200: AthletePreferencesSerializer}
     )
     def get(self, request):
-        try:
-            preferences = AthletePreferences.objects.get(athlete=request.user)
-            serializer = AthletePreferencesSerializer(preferences)
-            return Response(serializer.data)
-        except AthletePreferences.DoesNotExist:
+        # Version probe (one indexed column); the full row is only read
+        # and serialized when no payload is cached for this version
+        updated_at = AthletePreferences.objects.filter(
+            athlete=request.user
+        ).values_list("updated_at", flat=True).first()
+        
+        if updated_at is None:
             return Response(
                 {"detail": "پرسشنامه تطبیق هنوز تکمیل نشده است."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        key = prefs_payload_key(request.user.id, int(updated_at.timestamp() * 1_000_000))
+        payload = cache.get(key)
+        if payload is None:
+            preferences = AthletePreferences.objects.get(athlete=request.user)
+            payload = orjson.dumps(AthletePreferencesSerializer(preferences).data)
+            cache.set(key, payload, PREFS_PAYLOAD_TTL_SECONDS)
+        
+        return HttpResponse(payload, content_type="application/json")
     
     @extend_schema(
         summary="Submit matching quiz",
@@ -73,18 +103,7 @@ class CoachMatchingView(APIView):
     
     @extend_schema(
         summary="Get matched coaches",
-        parameters=[
-            OpenApiParameter(
-                name="limit",
-                type=int,
-                description="Maximum number of matches to return (default: 10)"
-            ),
-            OpenApiParameter(
-                name="refresh",
-                type=bool,
-                description="Force refresh cached results"
-            ),
-        ],
+        parameters=[MatchQueryParamsSerializer],
         responses={200: MatchingResultSerializer}
     )
     def get(self, request):
@@ -95,26 +114,45 @@ class CoachMatchingView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        limit = int(request.query_params.get("limit", 10))
-        force_refresh = request.query_params.get("refresh", "").lower() == "true"
+        params = MatchQueryParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        limit = params.validated_data["limit"]
+        force_refresh = params.validated_data["refresh"]
         
-        # Limit max results
-        limit = min(limit, 50)
+        key = match_coaches_payload_key(request.user.id, limit)
+        if not force_refresh:
+            payload = cache.get(key)
+            if payload is not None:
+                return HttpResponse(payload, content_type="application/json")
         
         service = CoachMatchingService()
-        result = service.match_coaches(
+        result = service.get_matches(
             athlete_id=request.user.id,
             limit=limit,
             force_refresh=force_refresh
         )
         
         serializer = MatchingResultSerializer(result)
-        return Response(serializer.data)
+        if not result.success:
+            return Response(serializer.data)
+        
+        payload = orjson.dumps(serializer.data)
+        cache.set(key, payload, MATCH_PAYLOAD_TTL_SECONDS)
+        return HttpResponse(payload, content_type="application/json")
+
+
+# Same output format MatchResultSerializer uses for score/created_at
+_SCORE_FIELD = BasisPointsField()
+_DATETIME_FIELD = serializers.DateTimeField()
 
 
 class MatchHistoryView(APIView):
     """
     GET: Get athlete's match history
+    
+    Read-only list of up to 50 rows: built from a .values() projection
+    instead of MatchResultSerializer, so no model instances or serializer
+    field loops are created. The response shape is unchanged.
     """
     
     permission_classes = [IsAuthenticated]
@@ -124,13 +162,55 @@ class MatchHistoryView(APIView):
         responses={200: MatchResultSerializer(many=True)}
     )
     def get(self, request):
-        matches = MatchResult.objects.filter(
-            athlete=request.user,
+        key = match_history_payload_key(request.user.id)
+        payload = cache.get(key)
+        if payload is None:
+            payload = self._build_payload(request.user)
+            cache.set(key, payload, MATCH_PAYLOAD_TTL_SECONDS)
+        
+        # Content hash, so any change to the rendered rows (including
+        # was_viewed/was_clicked flips) yields a new tag
+        etag = quote_etag(hashlib.md5(payload, usedforsecurity=False).hexdigest())
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        
+        response = HttpResponse(payload, content_type="application/json")
+        response["ETag"] = etag
+        return response
+    
+    def _build_payload(self, user):
+        """Rendered JSON bytes for the athlete's active matches"""
+        rows = MatchResult.objects.filter(
+            athlete=user,
             is_stale=False
-        ).select_related("coach").order_by("-score")[:50]
+        ).order_by("-score").values(
+            "id",
+            "coach_id",
+            "coach__first_name",
+            "coach__last_name",
+            "score",
+            "reasons",
+            "was_viewed",
+            "was_clicked",
+            "resulted_in_purchase",
+            "created_at",
+        )[:50]
         
-        serializer = MatchResultSerializer(matches, many=True)
-        return Response(serializer.data)
+        return orjson.dumps([
+            {
+                "id": row["id"],
+                "coach": row["coach_id"],
+                "coach_name": f"{row['coach__first_name']} {row['coach__last_name']}".strip(),
+                "score": _SCORE_FIELD.to_representation(row["score"]),
+                "reasons": row["reasons"],
+                "was_viewed": row["was_viewed"],
+                "was_clicked": row["was_clicked"],
+                "resulted_in_purchase": row["resulted_in_purchase"],
+                "created_at": _DATETIME_FIELD.to_representation(row["created_at"]),
+            }
+            for row in rows
+        ])
 
 
 class LogInteractionView(APIView):
@@ -153,19 +233,16 @@ class LogInteractionView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        service = CoachMatchingService()
-        
-        try:
-            service.log_interaction(
-                athlete_id=request.user.id,
-                coach_id=serializer.validated_data["coach_id"],
-                action=serializer.validated_data["action"],
-                context=serializer.validated_data.get("context", {}),
-                session_id=serializer.validated_data.get("session_id")
-            )
-            return Response({"success": True}, status=status.HTTP_201_CREATED)
-        except Exception as e:
-            return Response(
-                {"success": False, "error": str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+        # Analytics write is buffered in the Redis Stream (or queued when
+        # Redis is not configured); the click is acknowledged immediately
+        data = serializer.validated_data
+        args = (
+            request.user.id,
+            data["coach_id"].pk,
+            data["action"],
+            data.get("context", {}),
+            data.get("session_id")
+        )
+        if not enqueue_interaction(*args):
+            log_matching_interaction.delay(*args, timezone.now().isoformat())
+        return Response({"success": True}, status=status.HTTP_201_CREATED)
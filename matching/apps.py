@@ -6,4 +6,7 @@ from django.apps import AppConfig
 class MatchingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'matching'
-    verbose_name = 'Coach-Athlete Matching'
\ No newline at end of file
+    verbose_name = 'Coach-Athlete Matching'
+
+    def ready(self):
+        from matching import signals  # noqa: F401
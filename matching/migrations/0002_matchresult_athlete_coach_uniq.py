@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-16 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Older code could store the same pair more than once; keep the
+        # newest row per (athlete, coach) so the constraint can be added
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM matching_match_result
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY athlete_id, coach_id
+                            ORDER BY created_at DESC, id DESC
+                        ) AS rn
+                        FROM matching_match_result
+                    ) ranked
+                    WHERE rn > 1
+                )
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='matchresult',
+            constraint=models.UniqueConstraint(fields=('athlete', 'coach'), name='match_result_athlete_coach_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-16 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0002_matchresult_athlete_coach_uniq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matchresult',
+            index=models.Index(condition=models.Q(('is_stale', False)), fields=['athlete', '-score'], include=('coach', 'created_at'), name='match_active_athlete_score'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:20
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0003_matchresult_match_active_athlete_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athletepreferences',
+            name='bmi',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(height_cm__gt=0, then=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('weight_kg', models.FloatField()), '*', models.Value(10000.0)), '/', django.db.models.expressions.CombinedExpression(models.F('height_cm'), '*', models.F('height_cm'))), weight_kg__isnull=False), default=None), output_field=models.FloatField(null=True)),
+        ),
+    ]
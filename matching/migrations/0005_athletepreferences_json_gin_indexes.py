@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:20
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0004_athletepreferences_bmi'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='athletepreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['secondary_goals'], name='pref_secondary_goals_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='athletepreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['injuries'], name='pref_injuries_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='athletepreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['medical_conditions'], name='pref_medical_conditions_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='athletepreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['dietary_restrictions'], name='pref_dietary_restrictions_gin'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:24
+
+import uuid6
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0005_athletepreferences_json_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='athletepreferences',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='matchinginteraction',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='matchresult',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0006_uuid7_primary_keys'),
+    ]
+
+    # numeric(5,2) -> smallint basis points: widen so score * 100 fits,
+    # rescale in place, then narrow to the integer column.
+    operations = [
+        migrations.AlterField(
+            model_name='matchinginteraction',
+            name='match_score_at_time',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=7, null=True),
+        ),
+        migrations.AlterField(
+            model_name='matchresult',
+            name='score',
+            field=models.DecimalField(decimal_places=2, max_digits=7),
+        ),
+        migrations.RunSQL(
+            sql=[
+                'UPDATE "matching_match_result" SET "score" = round("score" * 100)',
+                'UPDATE "matching_interaction" SET "match_score_at_time" = round("match_score_at_time" * 100) '
+                'WHERE "match_score_at_time" IS NOT NULL',
+            ],
+            reverse_sql=[
+                'UPDATE "matching_match_result" SET "score" = "score" / 100',
+                'UPDATE "matching_interaction" SET "match_score_at_time" = "match_score_at_time" / 100 '
+                'WHERE "match_score_at_time" IS NOT NULL',
+            ],
+        ),
+        migrations.AlterField(
+            model_name='matchinginteraction',
+            name='match_score_at_time',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='matchresult',
+            name='score',
+            field=models.PositiveSmallIntegerField(),
+        ),
+    ]
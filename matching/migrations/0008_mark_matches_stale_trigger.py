@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0007_score_basis_points'),
+    ]
+
+    # Any saved change to an athlete's preferences retires their stored
+    # matches in the same transaction, whichever code path wrote it.
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                '''
+                CREATE OR REPLACE FUNCTION matching_mark_matches_stale() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE matching_match_result
+                       SET is_stale = TRUE
+                     WHERE athlete_id = NEW.athlete_id
+                       AND is_stale = FALSE;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+                ''',
+                '''
+                CREATE TRIGGER matching_prefs_mark_matches_stale
+                AFTER UPDATE ON matching_athlete_preferences
+                FOR EACH ROW
+                WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at)
+                EXECUTE FUNCTION matching_mark_matches_stale();
+                ''',
+            ],
+            reverse_sql=[
+                'DROP TRIGGER IF EXISTS matching_prefs_mark_matches_stale ON matching_athlete_preferences;',
+                'DROP FUNCTION IF EXISTS matching_mark_matches_stale();',
+            ],
+        ),
+    ]
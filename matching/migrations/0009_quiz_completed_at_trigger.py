@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0008_mark_matches_stale_trigger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                '''
+                CREATE OR REPLACE FUNCTION matching_stamp_quiz_completed_at() RETURNS trigger AS $$
+                BEGIN
+                    IF NEW.quiz_completed
+                       AND (TG_OP = 'INSERT' OR NOT OLD.quiz_completed) THEN
+                        NEW.quiz_completed_at := NOW();
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+                ''',
+                '''
+                CREATE TRIGGER matching_prefs_stamp_quiz_completed_at
+                BEFORE INSERT OR UPDATE OF quiz_completed ON matching_athlete_preferences
+                FOR EACH ROW
+                EXECUTE FUNCTION matching_stamp_quiz_completed_at();
+                ''',
+            ],
+            reverse_sql=[
+                'DROP TRIGGER IF EXISTS matching_prefs_stamp_quiz_completed_at ON matching_athlete_preferences;',
+                'DROP FUNCTION IF EXISTS matching_stamp_quiz_completed_at();',
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='athletepreferences',
+            index=models.Index(condition=models.Q(('quiz_completed', True)), fields=['quiz_completed_at'], name='pref_quiz_completed_at'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0009_quiz_completed_at_trigger'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='matchresult',
+            name='matching_ma_athlete_b0fced_idx',
+        ),
+    ]
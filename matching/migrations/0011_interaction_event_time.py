@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0010_drop_redundant_athlete_score_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='matchinginteraction',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,8 +1,11 @@
 # FILE: myfita/apps/backend/matching/models.py
 
-import uuid
+import uuid6
 from django.db import models
+from django.db.models.functions import Cast
+from django.utils import timezone
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -38,8 +41,21 @@ class AthletePreferences(models.Model):
         db_table = "matching_athlete_preferences"
         verbose_name = "Athlete Preferences"
         verbose_name_plural = "Athlete Preferences"
+        indexes = [
+            # jsonb containment (`field__contains=[...]`) uses these
+            GinIndex(fields=["secondary_goals"], name="pref_secondary_goals_gin"),
+            GinIndex(fields=["injuries"], name="pref_injuries_gin"),
+            GinIndex(fields=["medical_conditions"], name="pref_medical_conditions_gin"),
+            GinIndex(fields=["dietary_restrictions"], name="pref_dietary_restrictions_gin"),
+            # Quiz completion analytics only look at completed rows
+            models.Index(
+                fields=["quiz_completed_at"],
+                condition=models.Q(quiz_completed=True),
+                name="pref_quiz_completed_at",
+            ),
+        ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid6.uuid7, editable=False)
     athlete = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -112,7 +128,24 @@ class AthletePreferences(models.Model):
     medical_conditions = models.JSONField(default=list, blank=True)
     dietary_restrictions = models.JSONField(default=list, blank=True)
     
-    # Quiz completion tracking
+    # Stored BMI (kg/m²), computed by PostgreSQL on write so reads and
+    # range filters need no Python work; NULL until height and weight exist
+    bmi = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                height_cm__gt=0,
+                weight_kg__isnull=False,
+                then=Cast("weight_kg", models.FloatField()) * 10000.0
+                / (models.F("height_cm") * models.F("height_cm")),
+            ),
+            default=None,
+        ),
+        output_field=models.FloatField(null=True),
+        db_persist=True,
+    )
+    
+    # Quiz completion tracking (quiz_completed_at is set by a DB trigger
+    # when quiz_completed turns true)
     quiz_completed = models.BooleanField(default=False)
     quiz_completed_at = models.DateTimeField(null=True, blank=True)
     
@@ -122,14 +155,6 @@ class AthletePreferences(models.Model):
     
     def __str__(self):
         return f"Preferences for {self.athlete}"
-    
-    @property
-    def bmi(self):
-        """Calculate BMI if height and weight available"""
-        if self.height_cm and self.weight_kg:
-            height_m = self.height_cm / 100
-            return float(self.weight_kg) / (height_m ** 2)
-        return None
 
 
 class MatchResult(models.Model):
@@ -141,12 +166,31 @@ class MatchResult(models.Model):
     class Meta:
         db_table = "matching_match_result"
         ordering = ["-created_at"]
+        # Every MatchResult query filters by athlete: the active list
+        # (is_stale=False, by score) uses the partial index below, and
+        # (athlete, coach) lookups/updates use the unique constraint's
+        # index, whose athlete prefix also serves athlete-only filters
         indexes = [
-            models.Index(fields=["athlete", "-score"]),
             models.Index(fields=["coach", "-created_at"]),
+            # Hot path: an athlete's active matches, best first. Partial on
+            # is_stale=False and covering, so the top 50 come straight
+            # from the index (PostgreSQL)
+            models.Index(
+                fields=["athlete", "-score"],
+                condition=models.Q(is_stale=False),
+                include=["coach", "created_at"],
+                name="match_active_athlete_score",
+            ),
+        ]
+        constraints = [
+            # Conflict target for the bulk upsert in CoachMatchingService
+            models.UniqueConstraint(
+                fields=["athlete", "coach"],
+                name="match_result_athlete_coach_uniq"
+            ),
         ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid6.uuid7, editable=False)
     athlete = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -158,8 +202,8 @@ class MatchResult(models.Model):
         related_name="matched_for"
     )
     
-    # Scoring
-    score = models.DecimalField(max_digits=5, decimal_places=2)
+    # Scoring (basis points: 0-10000 == 0.00-100.00)
+    score = models.PositiveSmallIntegerField()
     score_breakdown = models.JSONField(default=dict)
     reasons = models.JSONField(default=list)
     
@@ -177,23 +221,36 @@ class MatchResult(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"Match: {self.athlete} → {self.coach} ({self.score})"
+        return f"Match: {self.athlete} → {self.coach} ({self.score / 100:.2f})"
     
     def mark_viewed(self):
         """Mark this match as viewed"""
         from django.utils import timezone
-        if not self.was_viewed:
+        from matching.services.matching_service import invalidate_match_payloads
+        now = timezone.now()
+        # Single conditional UPDATE: no re-save of the row, and only the
+        # first caller wins when two requests race
+        updated = MatchResult.objects.filter(
+            pk=self.pk, was_viewed=False
+        ).update(was_viewed=True, viewed_at=now)
+        if updated:
             self.was_viewed = True
-            self.viewed_at = timezone.now()
-            self.save(update_fields=["was_viewed", "viewed_at"])
+            self.viewed_at = now
+            # update() skips post_save, so drop cached payloads here
+            invalidate_match_payloads(self.athlete_id)
     
     def mark_clicked(self):
         """Mark this match as clicked"""
         from django.utils import timezone
-        if not self.was_clicked:
+        from matching.services.matching_service import invalidate_match_payloads
+        now = timezone.now()
+        updated = MatchResult.objects.filter(
+            pk=self.pk, was_clicked=False
+        ).update(was_clicked=True, clicked_at=now)
+        if updated:
             self.was_clicked = True
-            self.clicked_at = timezone.now()
-            self.save(update_fields=["was_clicked", "clicked_at"])
+            self.clicked_at = now
+            invalidate_match_payloads(self.athlete_id)
 
 
 class MatchingInteraction(models.Model):
@@ -219,7 +276,7 @@ class MatchingInteraction(models.Model):
             models.Index(fields=["coach", "action", "-created_at"]),
         ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid6.uuid7, editable=False)
     athlete = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -234,16 +291,13 @@ class MatchingInteraction(models.Model):
     action = models.CharField(max_length=20, choices=Action.choices)
     context = models.JSONField(default=dict, blank=True)
     
-    # For ML training
-    match_score_at_time = models.DecimalField(
-        max_digits=5,
-        decimal_places=2,
-        null=True,
-        blank=True
-    )
+    # For ML training (basis points, see MatchResult.score)
+    match_score_at_time = models.PositiveSmallIntegerField(null=True, blank=True)
     session_id = models.CharField(max_length=64, blank=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    # When the interaction happened; buffered writes pass the event time
+    # instead of the (later) time they were flushed
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     def __str__(self):
         return f"{self.athlete} → {self.action} → {self.coach}"
\ No newline at end of file
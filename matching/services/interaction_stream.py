@@ -0,0 +1,227 @@
+# FILE: myfita/apps/backend/matching/services/interaction_stream.py
+
+"""
+MATCHING INTERACTION STREAM
+
+Click-stream writes go to a Redis Stream (XADD, trimmed to MAXLEN) and a
+Celery beat task drains it with XREADGROUP, bulk-inserting
+MatchingInteraction rows and XACKing them once committed. One INSERT per
+batch replaces one INSERT (plus tracking UPDATE) per click. Entries that
+cannot be decoded are copied to "<stream>:dead" before being acked.
+
+Only active when the default cache is django_redis; otherwise callers
+fall back to the per-interaction Celery task.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from matching.models import MatchResult, MatchingInteraction
+from matching.services.matching_service import invalidate_match_payloads
+
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_GROUP = "interaction-flusher"
+CONSUMER_NAME = "flusher"
+FLUSH_LOCK_KEY = "lock:matching:interaction-flush"
+FLUSH_LOCK_SECONDS = 60
+DEAD_LETTER_SUFFIX = ":dead"
+
+# Interaction action -> MatchResult tracking columns it sets
+_TRACKING_UPDATES = {
+    MatchingInteraction.Action.VIEW_PROFILE: ("was_viewed", "viewed_at"),
+    MatchingInteraction.Action.CLICK_PROGRAM: ("was_clicked", "clicked_at"),
+    MatchingInteraction.Action.PURCHASE: ("resulted_in_purchase", "purchase_at"),
+}
+
+
+def _redis():
+    """Raw django_redis client, or None when the cache is not Redis"""
+    if not (hasattr(cache, "client") and hasattr(cache.client, "get_client")):
+        return None
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _entry_time(entry_id) -> datetime:
+    """Event time from a stream entry id (<milliseconds>-<sequence>)"""
+    millis = int(entry_id.split(b"-", 1)[0])
+    return datetime.fromtimestamp(millis / 1000, tz=dt_timezone.utc)
+
+
+def _pairs_q(pairs):
+    """OR of (athlete_id, coach_id) filters"""
+    return reduce(or_, (Q(athlete_id=a, coach_id=c) for a, c in pairs))
+
+
+def enqueue_interaction(athlete_id, coach_id, action, context=None, session_id=None) -> bool:
+    """
+    Append an interaction to the stream.
+    
+    Returns False (nothing written) when Redis is not available, so the
+    caller can persist it another way.
+    """
+    client = _redis()
+    if client is None:
+        return False
+    
+    config = settings.MATCHING_CONFIG
+    client.xadd(
+        config["INTERACTION_STREAM_KEY"],
+        {
+            "athlete_id": str(athlete_id),
+            "coach_id": str(coach_id),
+            "action": action,
+            "context": json.dumps(context or {}),
+            "session_id": session_id or "",
+        },
+        maxlen=config["INTERACTION_STREAM_MAXLEN"],
+        approximate=True,
+    )
+    return True
+
+
+def flush_interactions() -> int:
+    """
+    Drain the stream into MatchingInteraction rows. Returns rows written.
+    
+    Entries left pending by a crashed flush (read but never acked) are
+    retried first, then new entries are read in batches. A lock keeps
+    overlapping beat runs from re-reading the same pending entries.
+    """
+    client = _redis()
+    if client is None:
+        return 0
+    
+    if not client.set(FLUSH_LOCK_KEY, 1, nx=True, ex=FLUSH_LOCK_SECONDS):
+        return 0
+    try:
+        return _drain(client)
+    finally:
+        client.delete(FLUSH_LOCK_KEY)
+
+
+def _drain(client) -> int:
+    """Read, write and ack stream entries until the stream is empty"""
+    config = settings.MATCHING_CONFIG
+    stream = config["INTERACTION_STREAM_KEY"]
+    batch_size = config["INTERACTION_FLUSH_BATCH"]
+    
+    from redis.exceptions import ResponseError
+    try:
+        client.xgroup_create(stream, CONSUMER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+    
+    written = 0
+    start_id = "0"  # own pending entries first, then ">" for new ones
+    while True:
+        response = client.xreadgroup(
+            CONSUMER_GROUP, CONSUMER_NAME, {stream: start_id}, count=batch_size
+        )
+        entries = response[0][1] if response else []
+        if not entries:
+            if start_id == ">":
+                break
+            start_id = ">"
+            continue
+        
+        batch_written, malformed = _write_batch(entries)
+        written += batch_written
+        if malformed:
+            _dead_letter(client, stream, malformed)
+        client.xack(stream, CONSUMER_GROUP, *[entry_id for entry_id, _ in entries])
+    
+    return written
+
+
+def _dead_letter(client, stream, entries):
+    """Copy undecodable entries to <stream>:dead so acking them loses nothing"""
+    dead_key = f"{stream}{DEAD_LETTER_SUFFIX}"
+    pipe = client.pipeline()
+    for entry_id, fields in entries:
+        pipe.xadd(
+            dead_key,
+            {**fields, b"entry_id": entry_id},
+            maxlen=settings.MATCHING_CONFIG["INTERACTION_STREAM_MAXLEN"],
+            approximate=True,
+        )
+    pipe.execute()
+    logger.error(
+        "Moved %d malformed interaction entries to %s", len(entries), dead_key
+    )
+
+
+def _write_batch(entries):
+    """
+    Bulk-insert one batch of stream entries and apply match tracking.
+    
+    Returns (rows written, malformed entries); the caller dead-letters the
+    malformed ones before acking the batch.
+    """
+    rows = []
+    malformed = []
+    for entry_id, fields in entries:
+        try:
+            decoded = {k.decode(): v.decode() for k, v in fields.items()}
+            rows.append({
+                "athlete_id": int(decoded["athlete_id"]),
+                "coach_id": int(decoded["coach_id"]),
+                "action": decoded["action"],
+                "context": json.loads(decoded["context"]),
+                "session_id": decoded["session_id"],
+                "created_at": _entry_time(entry_id),
+            })
+        except (KeyError, ValueError):
+            malformed.append((entry_id, fields))
+    
+    if not rows:
+        return 0, malformed
+    
+    pairs = {(row["athlete_id"], row["coach_id"]) for row in rows}
+    scores = {
+        (a, c): score
+        for a, c, score in MatchResult.objects.filter(
+            _pairs_q(pairs), is_stale=False
+        ).values_list("athlete_id", "coach_id", "score")
+    }
+    
+    tracked = defaultdict(set)
+    for row in rows:
+        if row["action"] in _TRACKING_UPDATES:
+            tracked[row["action"]].add((row["athlete_id"], row["coach_id"]))
+    
+    now = timezone.now()
+    with transaction.atomic():
+        MatchingInteraction.objects.bulk_create(
+            [
+                MatchingInteraction(
+                    **row,
+                    match_score_at_time=scores.get((row["athlete_id"], row["coach_id"])),
+                )
+                for row in rows
+            ],
+            batch_size=500,
+        )
+        for action, action_pairs in tracked.items():
+            flag, stamp = _TRACKING_UPDATES[action]
+            MatchResult.objects.filter(_pairs_q(action_pairs)).update(
+                **{flag: True, stamp: now}
+            )
+    
+    for athlete_id in {a for a, _ in pairs}:
+        invalidate_match_payloads(athlete_id)
+    
+    return len(rows), malformed
@@ -1,10 +1,17 @@
 # FILE: myfita/apps/backend/matching/services/matching_service.py
 
+import hashlib
+import heapq
+import json
+import re
 import uuid
-from decimal import Decimal
+from operator import itemgetter
 from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
-from django.db.models import Q, Avg, Count, F
+from dataclasses import dataclass, field, asdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Avg, Count, F, Max, Min, Subquery
 from django.utils import timezone
 
 from users.models import User
@@ -14,13 +21,13 @@ from matching.models import AthletePreferences, MatchResult, MatchingInteraction
 @dataclass
 class CoachMatch:
     """Individual coach match result"""
-    coach_id: uuid.UUID
+    coach_id: int
     coach_name: str
-    score: Decimal
+    score: int  # basis points (0-10000)
     reasons: List[str] = field(default_factory=list)
     score_breakdown: Dict[str, float] = field(default_factory=dict)
     specialties: List[str] = field(default_factory=list)
-    avg_rating: Decimal = Decimal("0.00")
+    avg_rating: float = 0.0
     total_clients: int = 0
     total_programs: int = 0
     price_range_min: int = 0
@@ -41,6 +48,142 @@ class MatchingResult:
     error: Optional[str] = None
 
 
+@dataclass(frozen=True, slots=True)
+class _ScoringPrefs:
+    """
+    Plain snapshot of the AthletePreferences fields the scorers read.
+    
+    Built once per match run: slot reads instead of model attribute
+    access per coach, with the city normalized up front.
+    """
+    primary_goal: str
+    secondary_goals: tuple
+    experience_level: str
+    preferred_city: str  # lower-cased, stripped
+    max_budget: Optional[int]
+    preferred_coach_gender: str
+    
+    @classmethod
+    def from_preferences(cls, preferences: AthletePreferences) -> "_ScoringPrefs":
+        return cls(
+            primary_goal=preferences.primary_goal,
+            secondary_goals=tuple(preferences.secondary_goals or ()),
+            experience_level=preferences.experience_level,
+            preferred_city=(preferences.preferred_city or "").lower().strip(),
+            max_budget=preferences.max_budget,
+            preferred_coach_gender=preferences.preferred_coach_gender,
+        )
+
+
+def _result_to_cache(result: MatchingResult) -> Dict[str, Any]:
+    """
+    Flatten a MatchingResult into msgpack-native types for caching.
+    
+    The Redis cache uses the msgpack serializer; every CoachMatch field
+    (int coach id, numbers, strings, lists) is already msgpack-native.
+    """
+    return {
+        "matches": [asdict(match) for match in result.matches],
+        "total_coaches_evaluated": result.total_coaches_evaluated,
+        "preferences_used": result.preferences_used,
+    }
+
+
+def _result_from_cache(data: Dict[str, Any]) -> MatchingResult:
+    """Rebuild a MatchingResult from a `_result_to_cache` payload"""
+    return MatchingResult(
+        success=True,
+        matches=[CoachMatch(**item) for item in data["matches"]],
+        total_coaches_evaluated=data["total_coaches_evaluated"],
+        preferences_used=data["preferences_used"],
+    )
+
+
+# AthletePreferences columns that decide a match list; their hash keys
+# the cached result, so changed answers can never read an old list
+_PREFS_HASH_FIELDS = (
+    "primary_goal",
+    "secondary_goals",
+    "experience_level",
+    "preferred_city",
+    "max_budget",
+    "preferred_coach_gender",
+)
+
+
+def _prefs_hash(prefs_values: Dict[str, Any]) -> str:
+    """Short, stable digest of the scoring preferences (not security-sensitive)"""
+    raw = json.dumps(prefs_values, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def _match_cache_key(athlete_id, limit: int, prefs_hash: str) -> str:
+    """Cache key for a match list; prefs_hash is `_prefs_hash` of the quiz answers"""
+    return f"matching:athlete:{athlete_id}:prefs:{prefs_hash}:limit:{limit}"
+
+
+def invalidate_match_cache(athlete_id) -> None:
+    """
+    Drop every cached match list for an athlete.
+    
+    Keys already embed the preferences hash, so this only frees memory
+    early; it needs django_redis (SCAN + DEL) and is a no-op elsewhere.
+    """
+    if hasattr(cache, "delete_pattern"):
+        # Match lists are written under CACHE_VERSION, not the default 1
+        cache.delete_pattern(
+            f"matching:athlete:{athlete_id}:*",
+            version=settings.MATCHING_CONFIG["CACHE_VERSION"],
+        )
+    invalidate_match_payloads(athlete_id)
+
+
+# Rendered API payloads (JSON bytes) cached by the matching views
+MATCH_PAYLOAD_TTL_SECONDS = 60
+
+
+def match_history_payload_key(athlete_id) -> str:
+    return f"match:hist:{athlete_id}:v1"
+
+
+def match_coaches_payload_key(athlete_id, limit: int) -> str:
+    return f"match:coaches:{athlete_id}:{limit}:v1"
+
+
+# Preferences payloads carry updated_at in the key, so a save retires them
+PREFS_PAYLOAD_TTL_SECONDS = 60 * 60
+
+
+def prefs_payload_key(athlete_id, prefs_version: int) -> str:
+    """prefs_version is AthletePreferences.updated_at in epoch microseconds"""
+    return f"prefs:{athlete_id}:v:{prefs_version}"
+
+
+def invalidate_match_payloads(athlete_id) -> None:
+    """
+    Drop the cached API payloads for an athlete.
+    
+    Called wherever MatchResult rows change, including bulk_create() and
+    update() paths that bypass model signals.
+    """
+    max_limit = settings.MATCHING_CONFIG["MAX_MATCH_LIMIT"]
+    cache.delete_many(
+        [match_history_payload_key(athlete_id)]
+        + [match_coaches_payload_key(athlete_id, n) for n in range(1, max_limit + 1)]
+    )
+
+
+# Bio tokenizer: word characters (Unicode, so Persian included) plus the
+# zero-width non-joiner used inside Persian compounds like "چربی‌سوزی";
+# punctuation is dropped, so "bodybuilding," matches "bodybuilding"
+_TOKEN_RE = re.compile(r"[\w\u200c]+")
+
+
+def _compat_matrix(table: Dict[str, Dict[str, float]], levels: tuple) -> tuple:
+    """Nested compatibility dict -> tuple matrix in `levels` order"""
+    return tuple(tuple(table[row][col] for col in levels) for row in levels)
+
+
 class CoachMatchingService:
     """
     Rule-based coach matching service (Phase 1 - No ML).
@@ -71,6 +214,17 @@ class CoachMatchingService:
     WEIGHT_ACTIVITY = 5
     WEIGHT_GENDER = 5
     
+    # Max points still available after scoring components 1..5 (in the
+    # order _calculate_match_score runs them); used for top-K pruning
+    MAX_REMAINING = (
+        WEIGHT_LOCATION + WEIGHT_PRICE + WEIGHT_EXPERIENCE + WEIGHT_RATING
+        + WEIGHT_ACTIVITY + WEIGHT_GENDER,
+        WEIGHT_PRICE + WEIGHT_EXPERIENCE + WEIGHT_RATING + WEIGHT_ACTIVITY + WEIGHT_GENDER,
+        WEIGHT_EXPERIENCE + WEIGHT_RATING + WEIGHT_ACTIVITY + WEIGHT_GENDER,
+        WEIGHT_RATING + WEIGHT_ACTIVITY + WEIGHT_GENDER,
+        WEIGHT_ACTIVITY + WEIGHT_GENDER,
+    )
+    
     # Goal to specialty mapping (Persian keywords)
     GOAL_SPECIALTY_MAP = {
         "weight_loss": ["کاهش وزن", "چربی‌سوزی", "لاغری", "رژیم", "کاردیو", "weight_loss", "fat_burn"],
@@ -83,6 +237,12 @@ class CoachMatchingService:
         "rehabilitation": ["توانبخشی", "آسیب", "فیزیوتراپی", "rehab", "injury", "recovery"],
     }
     
+    # Lower-cased once at import; scoring only does set lookups
+    GOAL_KEYWORDS = {
+        goal: frozenset(k.lower() for k in keywords)
+        for goal, keywords in GOAL_SPECIALTY_MAP.items()
+    }
+    
     # Experience level compatibility matrix
     EXPERIENCE_COMPATIBILITY = {
         "beginner": {"beginner": 1.0, "intermediate": 0.8, "advanced": 0.4, "professional": 0.2},
@@ -91,6 +251,61 @@ class CoachMatchingService:
         "professional": {"beginner": 0.2, "intermediate": 0.4, "advanced": 0.8, "professional": 1.0},
     }
     
+    # Same table as a tuple matrix indexed by level position, so scoring
+    # does index lookups instead of nested dict gets
+    EXP_LEVELS = ("beginner", "intermediate", "advanced", "professional")
+    EXP_INDEX = {level: i for i, level in enumerate(EXP_LEVELS)}
+    EXPERIENCE_MATRIX = _compat_matrix(EXPERIENCE_COMPATIBILITY, EXP_LEVELS)
+    
+    # Choice labels for reason strings
+    GOAL_LABELS = dict(AthletePreferences.Goal.choices)
+    EXPERIENCE_LABELS = dict(AthletePreferences.ExperienceLevel.choices)
+    
+    def get_matches(
+        self,
+        athlete_id: uuid.UUID,
+        limit: int = 10,
+        force_refresh: bool = False
+    ) -> MatchingResult:
+        """
+        Cached entry point for `match_coaches`.
+        
+        Results are cached per (athlete, limit, preferences hash) for
+        MATCHING_CONFIG["CACHE_TTL_SECONDS"]; a hit skips scoring entirely
+        and costs one indexed single-row read for the hash inputs.
+        """
+        config = settings.MATCHING_CONFIG
+        
+        if not config["CACHE_MATCH_RESULTS"]:
+            return self.match_coaches(athlete_id, limit, force_refresh)
+        
+        prefs_values = AthletePreferences.objects.filter(
+            athlete_id=athlete_id
+        ).values(*_PREFS_HASH_FIELDS).first()
+        
+        if prefs_values is None:
+            return self.match_coaches(athlete_id, limit, force_refresh)
+        
+        key = _match_cache_key(athlete_id, limit, _prefs_hash(prefs_values))
+        version = config["CACHE_VERSION"]
+        
+        if force_refresh:
+            cache.delete(key, version=version)
+        else:
+            cached = cache.get(key, version=version)
+            if cached is not None:
+                return _result_from_cache(cached)
+        
+        result = self.match_coaches(athlete_id, limit, force_refresh)
+        if result.success:
+            cache.set(
+                key,
+                _result_to_cache(result),
+                timeout=config["CACHE_TTL_SECONDS"],
+                version=version
+            )
+        return result
+    
     def match_coaches(
         self,
         athlete_id: uuid.UUID,
@@ -104,84 +319,141 @@ class CoachMatchingService:
             athlete_id: UUID of athlete
             limit: Maximum number of matches to return
             force_refresh: If True, recalculate even if recent results exist
-            
+        
         Returns:
             MatchingResult with ranked coach matches
         """
         
-        # Get athlete preferences
+        # Get athlete preferences (health JSON is not used for scoring)
         try:
-            preferences = AthletePreferences.objects.get(athlete_id=athlete_id)
+            preferences = AthletePreferences.objects.defer(
+                "injuries", "medical_conditions", "dietary_restrictions"
+            ).get(athlete_id=athlete_id)
         except AthletePreferences.DoesNotExist:
             return MatchingResult(
                 success=False,
                 error="لطفاً ابتدا پرسشنامه تطبیق را تکمیل کنید."
             )
         
-        # Check for recent cached results (within 1 hour)
-        if not force_refresh:
+        # With the Redis result cache off, recent stored rows (within 1
+        # hour) stand in for it; a DB trigger marks them stale as soon as
+        # the preferences change
+        if not force_refresh and not settings.MATCHING_CONFIG["CACHE_MATCH_RESULTS"]:
             recent_cutoff = timezone.now() - timezone.timedelta(hours=1)
             cached = MatchResult.objects.filter(
                 athlete_id=athlete_id,
                 created_at__gte=recent_cutoff,
                 is_stale=False
+            ).select_related("coach").only(
+                # Just what _build_result_from_cache reads, coach row in the same JOIN
+                "score",
+                "reasons",
+                "score_breakdown",
+                "coach__id",
+                "coach__first_name",
+                "coach__last_name",
+                "coach__phone",
+                "coach__is_verified",
+            ).annotate(
+                published_count=Count(
+                    "coach__programs", filter=Q(coach__programs__status="published")
+                )
             ).order_by("-score")[:limit]
             
             if cached.exists():
                 return self._build_result_from_cache(cached, preferences)
         
-        # Get verified, active coaches
+        # Get verified, active coaches with their program/review stats
+        # aggregated in the same query (scorers read these annotations)
+        published = Q(programs__status="published")
+        approved = Q(programs__purchase_set__programreview_set__is_approved=True)
         coaches = User.objects.filter(
             role="coach",
             is_active=True
         ).exclude(
             id=athlete_id  # Cannot match with self
-        ).prefetch_related("programs")
+        ).only(
+            # User columns the scorers and _build_coach_match read; the
+            # price/program/rating figures come from the annotations
+            "id", "phone", "first_name", "last_name", "is_verified", "last_login"
+        ).annotate(
+            min_price=Min("programs__price_toman", filter=published),
+            max_price=Max("programs__price_toman", filter=published),
+            program_count=Count("programs", filter=published, distinct=True),
+            avg_rating=Avg(
+                "programs__purchase_set__programreview_set__rating", filter=approved
+            ),
+            total_reviews=Count(
+                "programs__purchase_set__programreview_set", filter=approved, distinct=True
+            ),
+        )
         
-        # Score each coach
-        scored_coaches = []
-        for coach in coaches:
-            score, breakdown, reasons = self._calculate_match_score(preferences, coach)
+        # Everything the scorers read from the athlete is resolved once
+        prefs = _ScoringPrefs.from_preferences(preferences)
+        targets = self._goal_targets(prefs)
+        
+        # Score each coach, keeping the best `limit` in a min-heap keyed
+        # by (score, -position): the root is the current cutoff, and on
+        # equal scores the earlier coach wins, as with a stable sort
+        heap = []
+        for position, coach in enumerate(coaches):
+            cutoff = heap[0][0] if len(heap) == limit else None
+            score, breakdown, reasons = self._calculate_match_score(
+                prefs, coach, targets, cutoff
+            )
             
-            if score > 0:
-                scored_coaches.append({
-                    "coach": coach,
-                    "score": score,
-                    "breakdown": breakdown,
-                    "reasons": reasons
-                })
-        
-        # Sort by score descending
-        scored_coaches.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Take top matches
-        top_matches = scored_coaches[:limit]
+            if score is None or score <= 0:
+                continue
+            
+            entry = (score, -position, {
+                "coach": coach,
+                "score": score,
+                "breakdown": breakdown,
+                "reasons": reasons
+            })
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        
+        top_matches = [
+            item for _, _, item in sorted(heap, key=itemgetter(0, 1), reverse=True)
+        ]
         
         # Build result and store for analytics
-        matches = []
-        for item in top_matches:
-            coach = item["coach"]
-            match = self._build_coach_match(coach, item)
-            matches.append(match)
-            
-            # Store match result
-            MatchResult.objects.update_or_create(
-                athlete_id=athlete_id,
-                coach=coach,
-                defaults={
-                    "score": match.score,
-                    "score_breakdown": item["breakdown"],
-                    "reasons": item["reasons"],
-                    "is_stale": False
-                }
+        matches = [self._build_coach_match(item["coach"], item) for item in top_matches]
+        
+        # Upsert + stale marking commit together: readers never see the
+        # new rows alongside the matches they replace
+        with transaction.atomic():
+            # Upsert all match rows in one INSERT ... ON CONFLICT statement
+            # (MatchResult has no save() signal logic to skip)
+            MatchResult.objects.bulk_create(
+                [
+                    MatchResult(
+                        athlete_id=athlete_id,
+                        coach=item["coach"],
+                        score=match.score,
+                        score_breakdown=item["breakdown"],
+                        reasons=item["reasons"],
+                        is_stale=False
+                    )
+                    for item, match in zip(top_matches, matches)
+                ],
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["athlete", "coach"],
+                update_fields=["score", "score_breakdown", "reasons", "is_stale", "created_at"]
             )
+            
+            # Mark old results as stale
+            MatchResult.objects.filter(
+                athlete_id=athlete_id
+            ).exclude(
+                coach_id__in=[m.coach_id for m in matches]
+            ).update(is_stale=True)
         
-        # Mark old results as stale
-        MatchResult.objects.filter(
-            athlete_id=athlete_id
-        ).exclude(
-            coach_id__in=[m.coach_id for m in matches]
-        ).update(is_stale=True)
+        invalidate_match_payloads(athlete_id)
         
         return MatchingResult(
             success=True,
@@ -195,56 +467,93 @@ class CoachMatchingService:
             }
         )
     
+    def _goal_targets(self, prefs: _ScoringPrefs) -> tuple:
+        """(primary goal keywords, [secondary goal keywords, ...])"""
+        empty = frozenset()
+        return (
+            self.GOAL_KEYWORDS.get(prefs.primary_goal, empty),
+            [
+                self.GOAL_KEYWORDS.get(secondary, empty)
+                for secondary in prefs.secondary_goals
+            ],
+        )
+    
     def _calculate_match_score(
         self,
-        preferences: AthletePreferences,
-        coach
+        prefs: _ScoringPrefs,
+        coach,
+        targets: tuple = None,
+        cutoff: float = None
     ) -> tuple:
         """
         Calculate match score between athlete preferences and coach.
         
+        Components run in descending weight order. With a `cutoff` (the
+        current top-K floor), scoring stops as soon as the points left
+        cannot lift the coach above it.
+        
         Returns:
-            Tuple of (score: float, breakdown: dict, reasons: List[str])
+            Tuple of (score: float, breakdown: dict, reasons: List[str]),
+            or (None, None, None) when pruned by the cutoff
         """
         breakdown = {}
         reasons = []
+        total = 0
         
         # 1. Specialty/Goal Match (35 points)
-        specialty_score, specialty_reason = self._score_specialty_match(preferences, coach)
+        specialty_score, specialty_reason = self._score_specialty_match(
+            prefs, coach, targets
+        )
         breakdown["specialty"] = specialty_score
+        total += specialty_score
         if specialty_reason:
             reasons.append(specialty_reason)
+        if cutoff is not None and total + self.MAX_REMAINING[0] < cutoff:
+            return None, None, None
         
         # 2. Location Match (20 points)
-        location_score, location_reason = self._score_location_match(preferences, coach)
+        location_score, location_reason = self._score_location_match(prefs, coach)
         breakdown["location"] = location_score
+        total += location_score
         if location_reason:
             reasons.append(location_reason)
+        if cutoff is not None and total + self.MAX_REMAINING[1] < cutoff:
+            return None, None, None
         
         # 3. Price Fit (15 points)
-        price_score, price_reason = self._score_price_fit(preferences, coach)
+        price_score, price_reason = self._score_price_fit(prefs, coach)
         breakdown["price"] = price_score
+        total += price_score
         if price_reason:
             reasons.append(price_reason)
+        if cutoff is not None and total + self.MAX_REMAINING[2] < cutoff:
+            return None, None, None
         
         # 4. Experience Level Match (10 points)
-        exp_score, exp_reason = self._score_experience_match(preferences, coach)
+        exp_score, exp_reason = self._score_experience_match(prefs, coach)
         breakdown["experience"] = exp_score
+        total += exp_score
         if exp_reason:
             reasons.append(exp_reason)
+        if cutoff is not None and total + self.MAX_REMAINING[3] < cutoff:
+            return None, None, None
         
         # 5. Rating & Reviews (10 points)
         rating_score, rating_reason = self._score_rating(coach)
         breakdown["rating"] = rating_score
+        total += rating_score
         if rating_reason:
             reasons.append(rating_reason)
+        if cutoff is not None and total + self.MAX_REMAINING[4] < cutoff:
+            return None, None, None
         
         # 6. Activity/Availability (5 points)
         activity_score = self._score_activity(coach)
         breakdown["activity"] = activity_score
+        total += activity_score
         
         # 7. Gender Preference (5 points)
-        gender_score = self._score_gender_preference(preferences, coach)
+        gender_score = self._score_gender_preference(prefs, coach)
         breakdown["gender"] = gender_score
         
         total_score = sum(breakdown.values())
@@ -253,11 +562,14 @@ class CoachMatchingService:
     
     def _score_specialty_match(
         self,
-        preferences: AthletePreferences,
-        coach
+        prefs: _ScoringPrefs,
+        coach,
+        targets: tuple = None
     ) -> tuple:
         """Score based on goal-specialty alignment"""
         
+        primary_keywords, secondary_keywords = targets or self._goal_targets(prefs)
+        
         coach_specialties = getattr(coach, "specialties", []) or []
         coach_bio = getattr(coach, "bio", "") or ""
         
@@ -265,44 +577,36 @@ class CoachMatchingService:
             return self.WEIGHT_SPECIALTY * 0.3, None
         
         # Combine specialties and bio for matching
-        coach_keywords = set(s.lower() for s in coach_specialties)
-        coach_keywords.update(coach_bio.lower().split())
-        
-        # Get relevant keywords for athlete's goal
-        target_keywords = set(
-            k.lower() for k in self.GOAL_SPECIALTY_MAP.get(preferences.primary_goal, [])
-        )
-        
-        # Check for overlap
-        matching = coach_keywords & target_keywords
+        coach_keywords = set(_TOKEN_RE.findall(coach_bio.lower())) if coach_bio else set()
+        coach_keywords.update(s.lower() for s in coach_specialties)
         
-        if matching:
-            goal_display = dict(AthletePreferences.Goal.choices).get(
-                preferences.primary_goal, preferences.primary_goal
+        # Check for overlap (isdisjoint stops at the first shared keyword)
+        if not coach_keywords.isdisjoint(primary_keywords):
+            goal_display = self.GOAL_LABELS.get(
+                prefs.primary_goal, prefs.primary_goal
             )
             return self.WEIGHT_SPECIALTY, f"متخصص {goal_display}"
         
         # Check secondary goals
-        for secondary in (preferences.secondary_goals or []):
-            target = set(k.lower() for k in self.GOAL_SPECIALTY_MAP.get(secondary, []))
-            if coach_keywords & target:
+        for target in secondary_keywords:
+            if not coach_keywords.isdisjoint(target):
                 return self.WEIGHT_SPECIALTY * 0.6, "مرتبط با اهداف شما"
         
         return self.WEIGHT_SPECIALTY * 0.2, None
     
     def _score_location_match(
         self,
-        preferences: AthletePreferences,
+        prefs: _ScoringPrefs,
         coach
     ) -> tuple:
         """Score based on location proximity"""
         
-        if not preferences.preferred_city:
+        if not prefs.preferred_city:
             return self.WEIGHT_LOCATION * 0.5, None
         
         coach_city = getattr(coach, "city", "") or ""
         
-        if coach_city and coach_city.lower().strip() == preferences.preferred_city.lower().strip():
+        if coach_city and coach_city.lower().strip() == prefs.preferred_city:
             return self.WEIGHT_LOCATION, f"در {coach_city}"
         
         # Province-level matching could be added here
@@ -310,34 +614,32 @@ class CoachMatchingService:
     
     def _score_price_fit(
         self,
-        preferences: AthletePreferences,
+        prefs: _ScoringPrefs,
         coach
     ) -> tuple:
         """Score based on price range fit"""
         
-        if not preferences.max_budget:
+        if not prefs.max_budget:
             return self.WEIGHT_PRICE * 0.5, None
         
-        # Get coach's program prices
-        programs = coach.programs.filter(status="published") if hasattr(coach, "programs") else []
+        # Cheapest published program (annotated in match_coaches)
+        min_price = getattr(coach, "min_price", None)
         
-        if not programs:
+        if min_price is None:
             return self.WEIGHT_PRICE * 0.3, None
         
-        min_price = min(p.price for p in programs)
-        
-        if min_price <= preferences.max_budget:
+        if min_price <= prefs.max_budget:
             return self.WEIGHT_PRICE, "در محدوده بودجه شما"
         
         # Within 20% over budget
-        if min_price <= preferences.max_budget * 1.2:
+        if min_price <= prefs.max_budget * 1.2:
             return self.WEIGHT_PRICE * 0.5, "نزدیک به بودجه شما"
         
         return 0, None
     
     def _score_experience_match(
         self,
-        preferences: AthletePreferences,
+        prefs: _ScoringPrefs,
         coach
     ) -> tuple:
         """Score based on experience level compatibility"""
@@ -348,17 +650,19 @@ class CoachMatchingService:
             return self.WEIGHT_EXPERIENCE * 0.5, None
         
         # Get compatibility score
-        athlete_level = preferences.experience_level
+        athlete_level = prefs.experience_level
+        athlete_index = self.EXP_INDEX.get(athlete_level)
         best_match = 0
         
-        for coach_level in coach_target_levels:
-            compat = self.EXPERIENCE_COMPATIBILITY.get(athlete_level, {}).get(coach_level, 0)
-            best_match = max(best_match, compat)
+        if athlete_index is not None:
+            row = self.EXPERIENCE_MATRIX[athlete_index]
+            for coach_level in coach_target_levels:
+                coach_index = self.EXP_INDEX.get(coach_level)
+                if coach_index is not None and row[coach_index] > best_match:
+                    best_match = row[coach_index]
         
         if best_match >= 0.8:
-            level_display = dict(AthletePreferences.ExperienceLevel.choices).get(
-                athlete_level, athlete_level
-            )
+            level_display = self.EXPERIENCE_LABELS.get(athlete_level, athlete_level)
             return self.WEIGHT_EXPERIENCE * best_match, f"مناسب سطح {level_display}"
         
         return self.WEIGHT_EXPERIENCE * best_match, None
@@ -373,9 +677,9 @@ class CoachMatchingService:
             return self.WEIGHT_RATING * 0.3, None
         
         if avg_rating >= 4.5:
-            return self.WEIGHT_RATING, f"⭐ {avg_rating}"
+            return self.WEIGHT_RATING, f"⭐ {avg_rating:.1f}"
         elif avg_rating >= 4.0:
-            return self.WEIGHT_RATING * 0.8, f"⭐ {avg_rating}"
+            return self.WEIGHT_RATING * 0.8, f"⭐ {avg_rating:.1f}"
         elif avg_rating >= 3.5:
             return self.WEIGHT_RATING * 0.5, None
         
@@ -402,12 +706,12 @@ class CoachMatchingService:
     
     def _score_gender_preference(
         self,
-        preferences: AthletePreferences,
+        prefs: _ScoringPrefs,
         coach
     ) -> float:
         """Score based on gender preference"""
         
-        if preferences.preferred_coach_gender == "no_preference":
+        if prefs.preferred_coach_gender == "no_preference":
             return self.WEIGHT_GENDER
         
         coach_gender = getattr(coach, "gender", None)
@@ -415,7 +719,7 @@ class CoachMatchingService:
         if not coach_gender:
             return self.WEIGHT_GENDER * 0.5
         
-        if coach_gender == preferences.preferred_coach_gender:
+        if coach_gender == prefs.preferred_coach_gender:
             return self.WEIGHT_GENDER
         
         return 0
@@ -423,24 +727,18 @@ class CoachMatchingService:
     def _build_coach_match(self, coach, item: dict) -> CoachMatch:
         """Build CoachMatch object from coach and scoring data"""
         
-        # Get program stats
-        programs = list(coach.programs.filter(status="published")) if hasattr(coach, "programs") else []
-        
-        price_min = min((p.price for p in programs), default=0)
-        price_max = max((p.price for p in programs), default=0)
-        
         return CoachMatch(
             coach_id=coach.id,
             coach_name=coach.get_full_name() or coach.phone,
-            score=Decimal(str(round(item["score"], 2))),
+            score=round(item["score"] * 100),
             reasons=item["reasons"],
             score_breakdown=item["breakdown"],
             specialties=getattr(coach, "specialties", []) or [],
-            avg_rating=Decimal(str(getattr(coach, "avg_rating", 0) or 0)),
+            avg_rating=round(getattr(coach, "avg_rating", 0) or 0, 2),
             total_clients=getattr(coach, "total_clients", 0) or 0,
-            total_programs=len(programs),
-            price_range_min=price_min,
-            price_range_max=price_max,
+            total_programs=getattr(coach, "program_count", 0),
+            price_range_min=int(getattr(coach, "min_price", None) or 0),
+            price_range_max=int(getattr(coach, "max_price", None) or 0),
             city=getattr(coach, "city", "") or "",
             profile_image=coach.profile_image.url if hasattr(coach, "profile_image") and coach.profile_image else None,
             is_verified=getattr(coach, "is_verified", False),
@@ -452,7 +750,11 @@ class CoachMatchingService:
         cached_results,
         preferences: AthletePreferences
     ) -> MatchingResult:
-        """Build MatchingResult from cached MatchResult objects"""
+        """
+        Build MatchingResult from cached MatchResult objects.
+        
+        Expects the queryset annotated with `published_count`.
+        """
         
         matches = []
         for result in cached_results:
@@ -464,9 +766,9 @@ class CoachMatchingService:
                 reasons=result.reasons,
                 score_breakdown=result.score_breakdown,
                 specialties=getattr(coach, "specialties", []) or [],
-                avg_rating=Decimal(str(getattr(coach, "avg_rating", 0) or 0)),
+                avg_rating=round(getattr(coach, "avg_rating", 0) or 0, 2),
                 total_clients=getattr(coach, "total_clients", 0) or 0,
-                total_programs=coach.programs.filter(status="published").count() if hasattr(coach, "programs") else 0,
+                total_programs=result.published_count,
                 city=getattr(coach, "city", "") or "",
                 is_verified=getattr(coach, "is_verified", False)
             ))
@@ -482,56 +784,65 @@ class CoachMatchingService:
     
     def log_interaction(
         self,
-        athlete_id: uuid.UUID,
-        coach_id: uuid.UUID,
+        athlete_id: int,
+        coach_id: int,
         action: str,
         context: dict = None,
-        session_id: str = None
+        session_id: str = None,
+        occurred_at=None
     ) -> MatchingInteraction:
         """
         Log an interaction for ML training data collection.
         
         BP: "captures structured data... enabling better personalization"
+        
+        The current match score is read by a subquery inside the INSERT
+        (the returned instance holds that expression, not the value; call
+        refresh_from_db() to read it), and the insert and tracking update
+        commit together. `occurred_at` (default: now) is the event time
+        for queued writes.
         """
+        when = occurred_at or timezone.now()
         
-        # Get current match score if exists
-        match_score = None
-        try:
-            match_result = MatchResult.objects.get(
+        # Current match score, if any (the (athlete, coach) unique index)
+        match_score = Subquery(
+            MatchResult.objects.filter(
                 athlete_id=athlete_id,
                 coach_id=coach_id,
                 is_stale=False
-            )
-            match_score = match_result.score
-        except MatchResult.DoesNotExist:
-            pass
-        
-        interaction = MatchingInteraction.objects.create(
-            athlete_id=athlete_id,
-            coach_id=coach_id,
-            action=action,
-            context=context or {},
-            match_score_at_time=match_score,
-            session_id=session_id or ""
+            ).order_by().values("score")[:1]
         )
         
-        # Update match result tracking
-        if action == MatchingInteraction.Action.VIEW_PROFILE:
-            MatchResult.objects.filter(
+        with transaction.atomic():
+            interaction = MatchingInteraction.objects.create(
                 athlete_id=athlete_id,
-                coach_id=coach_id
-            ).update(was_viewed=True, viewed_at=timezone.now())
-        
-        elif action == MatchingInteraction.Action.CLICK_PROGRAM:
-            MatchResult.objects.filter(
-                athlete_id=athlete_id,
-                coach_id=coach_id
-            ).update(was_clicked=True, clicked_at=timezone.now())
+                coach_id=coach_id,
+                action=action,
+                context=context or {},
+                match_score_at_time=match_score,
+                session_id=session_id or "",
+                created_at=when
+            )
+            
+            # Update match result tracking
+            if action == MatchingInteraction.Action.VIEW_PROFILE:
+                MatchResult.objects.filter(
+                    athlete_id=athlete_id,
+                    coach_id=coach_id
+                ).update(was_viewed=True, viewed_at=when)
+            
+            elif action == MatchingInteraction.Action.CLICK_PROGRAM:
+                MatchResult.objects.filter(
+                    athlete_id=athlete_id,
+                    coach_id=coach_id
+                ).update(was_clicked=True, clicked_at=when)
+            
+            elif action == MatchingInteraction.Action.PURCHASE:
+                MatchResult.objects.filter(
+                    athlete_id=athlete_id,
+                    coach_id=coach_id
+                ).update(resulted_in_purchase=True, purchase_at=when)
         
-        elif action == MatchingInteraction.Action.PURCHASE:
-            MatchResult.objects.filter(
-                athlete_id=athlete_id,
-                coach_id=coach_id
-            ).update(resulted_in_purchase=True, purchase_at=timezone.now())
+        invalidate_match_payloads(athlete_id)
         
         return interaction
\ No newline at end of file
@@ -1,10 +1,15 @@
 # FILE: myfita/apps/backend/matching/services/scoring_service.py
 
-from decimal import Decimal
+import math
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 
+# 0.5 ** (days / 30) for the default half-life, one entry per day of a year
+_DEFAULT_HALF_LIFE_DAYS = 30
+_DECAY_TABLE = tuple(0.5 ** (d / _DEFAULT_HALF_LIFE_DAYS) for d in range(366))
+
+
 @dataclass
 class ScoreComponent:
     """Individual score component"""
@@ -18,9 +23,9 @@ class ScoreComponent:
 @dataclass
 class DetailedScore:
     """Detailed scoring breakdown"""
-    total_score: Decimal
-    max_possible: Decimal
-    percentage: Decimal
+    total_score: float
+    max_possible: float
+    percentage: float
     components: List[ScoreComponent]
     top_reasons: List[str]
 
@@ -87,9 +92,9 @@ class ScoringService:
         score_components.sort(key=lambda x: x.weighted_score, reverse=True)
         
         return DetailedScore(
-            total_score=Decimal(str(round(total, 2))),
-            max_possible=Decimal(str(self.max_score)),
-            percentage=Decimal(str(round((total / self.max_score) * 100, 1))),
+            total_score=round(total, 2),
+            max_possible=float(self.max_score),
+            percentage=round((total / self.max_score) * 100, 1),
             components=score_components,
             top_reasons=reasons
         )
@@ -211,7 +216,13 @@ class ScoringService:
         Returns:
             Decayed score
         """
-        import math
+        # Table lookup for whole days only; fractional ages are computed
+        if (
+            half_life_days == _DEFAULT_HALF_LIFE_DAYS
+            and isinstance(days_old, int)
+            and 0 <= days_old < len(_DECAY_TABLE)
+        ):
+            return score * _DECAY_TABLE[days_old]
         
         decay_factor = math.pow(0.5, days_old / half_life_days)
         return score * decay_factor
@@ -0,0 +1,23 @@
+# FILE: myfita/apps/backend/matching/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from matching.models import AthletePreferences, MatchResult
+from matching.services.matching_service import (
+    invalidate_match_cache,
+    invalidate_match_payloads,
+)
+
+
+@receiver(post_save, sender=AthletePreferences)
+def drop_cached_matches(sender, instance, **kwargs):
+    """New quiz answers invalidate previously cached match lists"""
+    invalidate_match_cache(instance.athlete_id)
+
+
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+def drop_cached_match_payloads(sender, instance, **kwargs):
+    """Per-row saves/deletes invalidate rendered payloads"""
+    invalidate_match_payloads(instance.athlete_id)
@@ -0,0 +1,44 @@
+# FILE: myfita/apps/backend/matching/tasks.py
+
+"""
+MATCHING BACKGROUND TASKS
+"""
+
+from celery import shared_task
+from django.db import OperationalError
+from django.utils.dateparse import parse_datetime
+
+from matching.services.interaction_stream import flush_interactions
+from matching.services.matching_service import CoachMatchingService
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def log_matching_interaction(
+    self, athlete_id, coach_id, action, context, session_id, occurred_at=None
+):
+    """Persist a matching interaction off the request path"""
+    CoachMatchingService().log_interaction(
+        athlete_id=athlete_id,
+        coach_id=coach_id,
+        action=action,
+        context=context,
+        session_id=session_id,
+        occurred_at=parse_datetime(occurred_at) if occurred_at else None
+    )
+
+
+@shared_task(
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def flush_matching_interactions():
+    """Batch-insert interactions buffered in the Redis Stream"""
+    return flush_interactions()
@@ -0,0 +1,304 @@
+# FILE: myfita/apps/backend/matching/tests.py
+
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from matching.models import MatchResult, MatchingInteraction
+from matching.services import interaction_stream
+from matching.services.matching_service import (
+    CoachMatch,
+    MatchingResult,
+    _result_from_cache,
+    _result_to_cache,
+)
+from matching.services.scoring_service import ScoringService
+from matching.tasks import log_matching_interaction
+
+from users.models import User
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _sample_result():
+    return MatchingResult(
+        success=True,
+        matches=[
+            CoachMatch(
+                coach_id=42,
+                coach_name="Sara Ahmadi",
+                score=8750,
+                reasons=["Specializes in your goal"],
+                score_breakdown={"goal": 0.9, "location": 0.5},
+                specialties=["weight_loss"],
+                avg_rating=4.75,
+                total_clients=12,
+                city="Tehran",
+                is_verified=True,
+            ),
+            CoachMatch(coach_id=7, coach_name="", score=0),
+        ],
+        total_coaches_evaluated=2,
+        preferences_used={
+            "primary_goal": "weight_loss",
+            "experience_level": "beginner",
+            "preferred_city": "Tehran",
+            "max_budget": None,
+        },
+    )
+
+
+class MatchResultCacheTests(SimpleTestCase):
+    def test_round_trip(self):
+        result = _sample_result()
+        self.assertEqual(_result_from_cache(_result_to_cache(result)), result)
+
+    def test_round_trip_through_msgpack(self):
+        if msgpack is None:
+            self.skipTest("msgpack not installed")
+        result = _sample_result()
+        # Same calls as django_redis' MSGPackSerializer
+        packed = msgpack.dumps(_result_to_cache(result))
+        self.assertEqual(_result_from_cache(msgpack.loads(packed, raw=False)), result)
+
+
+class ApplyDecayTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ScoringService()
+
+    def test_whole_days_match_the_formula(self):
+        for days in (0, 1, 30, 365, 400):
+            self.assertAlmostEqual(
+                self.service.apply_decay(1.0, days), 0.5 ** (days / 30)
+            )
+
+    def test_fractional_days(self):
+        self.assertAlmostEqual(self.service.apply_decay(1.0, 1.5), 0.5 ** (1.5 / 30))
+        self.assertAlmostEqual(self.service.apply_decay(2.0, 30.0), 1.0)
+
+    def test_custom_half_life(self):
+        self.assertAlmostEqual(self.service.apply_decay(1.0, 7, half_life_days=7), 0.5)
+
+
+def _b(value):
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeStreamClient:
+    """In-memory stand-in for the redis-py calls the flusher makes"""
+
+    def __init__(self, pending=(), new=()):
+        self.pending = list(pending)
+        self.new = list(new)
+        self.reads = []
+        self.acked = []
+        self.keys = set()
+        self.added = defaultdict(list)
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        # redis-py hands fields back as bytes
+        self.added[key].append({_b(k): _b(v) for k, v in fields.items()})
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+    def delete(self, key):
+        self.keys.discard(key)
+
+    def xgroup_create(self, stream, group, id="0", mkstream=False):
+        pass
+
+    def xreadgroup(self, group, consumer, streams, count=None):
+        (stream, start_id), = streams.items()
+        self.reads.append(start_id)
+        source = self.pending if start_id == "0" else self.new
+        batch, source[:count] = source[:count], []
+        return [[stream.encode(), batch]] if batch else []
+
+    def xack(self, stream, group, *ids):
+        self.acked.extend(ids)
+
+
+def _entry(entry_id, athlete_id=1, coach_id=2, action="view_profile"):
+    return entry_id, {
+        b"athlete_id": str(athlete_id).encode(),
+        b"coach_id": str(coach_id).encode(),
+        b"action": action.encode(),
+        b"context": b"{}",
+        b"session_id": b"",
+    }
+
+
+@override_settings(MATCHING_CONFIG={
+    "INTERACTION_STREAM_KEY": "stream:test",
+    "INTERACTION_STREAM_MAXLEN": 1000,
+    "INTERACTION_FLUSH_BATCH": 2,
+})
+class InteractionFlushTests(SimpleTestCase):
+    def _flush(self, client):
+        written_batches = []
+
+        def write_batch(entries):
+            written_batches.append([entry_id for entry_id, _ in entries])
+            return len(entries), []
+
+        with mock.patch.object(interaction_stream, "_redis", return_value=client), \
+                mock.patch.object(interaction_stream, "_write_batch", side_effect=write_batch):
+            written = interaction_stream.flush_interactions()
+        return written, written_batches
+
+    def test_pending_entries_are_retried_before_new_ones(self):
+        client = FakeStreamClient(
+            pending=[_entry(b"1-0")],
+            new=[_entry(b"2-0"), _entry(b"3-0"), _entry(b"4-0")],
+        )
+
+        written, batches = self._flush(client)
+
+        self.assertEqual(written, 4)
+        self.assertEqual(batches, [[b"1-0"], [b"2-0", b"3-0"], [b"4-0"]])
+        self.assertEqual(client.reads, ["0", "0", ">", ">", ">"])
+        self.assertEqual(client.acked, [b"1-0", b"2-0", b"3-0", b"4-0"])
+        self.assertNotIn(interaction_stream.FLUSH_LOCK_KEY, client.keys)
+
+    def test_overlapping_flush_is_skipped(self):
+        client = FakeStreamClient(new=[_entry(b"1-0")])
+        client.keys.add(interaction_stream.FLUSH_LOCK_KEY)
+
+        self.assertEqual(self._flush(client), (0, []))
+        self.assertEqual(client.acked, [])
+
+    def test_malformed_entries_are_dead_lettered_then_acked(self):
+        # A UUID coach id, as the API used to send, cannot be inserted
+        bad = _entry(b"1-0", coach_id="6f1c2a9e-3b1d-4a51-9d1e-0c2f7b8a9e10")
+        client = FakeStreamClient(new=[bad])
+
+        with mock.patch.object(interaction_stream, "_redis", return_value=client):
+            self.assertEqual(interaction_stream.flush_interactions(), 0)
+
+        self.assertEqual(client.acked, [b"1-0"])
+        self.assertEqual(
+            client.added["stream:test:dead"], [{**bad[1], b"entry_id": b"1-0"}]
+        )
+
+    def test_no_redis_is_a_no_op(self):
+        with mock.patch.object(interaction_stream, "_redis", return_value=None):
+            self.assertEqual(interaction_stream.flush_interactions(), 0)
+
+    def test_entry_time_comes_from_the_stream_id(self):
+        self.assertEqual(
+            interaction_stream._entry_time(b"1700000000123-4"),
+            datetime(2023, 11, 14, 22, 13, 20, 123000, tzinfo=dt_timezone.utc),
+        )
+
+
+class InteractionWriteBatchTests(TestCase):
+    def setUp(self):
+        self.athlete = User.objects.create_user(phone="09120000201", role="athlete")
+        self.coach = User.objects.create_user(phone="09120000202", role="coach")
+        MatchResult.objects.create(athlete=self.athlete, coach=self.coach, score=8100)
+
+    def test_batch_insert_with_score_and_tracking(self):
+        entries = [
+            _entry(b"1700000000000-0", self.athlete.id, self.coach.id, "view_profile"),
+            _entry(b"1700000001000-0", self.athlete.id, self.coach.id, "skip"),
+            (b"1700000002000-0", {b"action": b"view_profile"}),  # malformed
+        ]
+
+        written, malformed = interaction_stream._write_batch(entries)
+        self.assertEqual(written, 2)
+        self.assertEqual([entry_id for entry_id, _ in malformed], [b"1700000002000-0"])
+
+        rows = list(MatchingInteraction.objects.order_by("created_at"))
+        self.assertEqual([row.action for row in rows], ["view_profile", "skip"])
+        self.assertEqual({row.match_score_at_time for row in rows}, {8100})
+        self.assertEqual(
+            rows[0].created_at,
+            datetime(2023, 11, 14, 22, 13, 20, tzinfo=dt_timezone.utc),
+        )
+        self.assertTrue(MatchResult.objects.get().was_viewed)
+
+
+@override_settings(MATCHING_CONFIG={
+    "INTERACTION_STREAM_KEY": "stream:test",
+    "INTERACTION_STREAM_MAXLEN": 1000,
+    "INTERACTION_FLUSH_BATCH": 100,
+})
+class LogInteractionEndToEndTests(TestCase):
+    """Real API payloads, through the stream and flusher into the table"""
+
+    def setUp(self):
+        self.athlete = User.objects.create_user(phone="09120000301", role="athlete")
+        self.coach = User.objects.create_user(phone="09120000302", role="coach")
+        self.api = APIClient()
+        self.api.force_authenticate(self.athlete)
+
+    def _post(self, coach_id):
+        return self.api.post(
+            reverse("matching:log-interaction"),
+            {"coach_id": coach_id, "action": "view_profile", "context": {"rank": 1}},
+            format="json",
+        )
+
+    def test_click_is_written_by_the_flusher(self):
+        client = FakeStreamClient()
+        with mock.patch.object(interaction_stream, "_redis", return_value=client):
+            self.assertEqual(self._post(self.coach.id).status_code, 201)
+            # What XREADGROUP would hand the flusher
+            client.new = [
+                (f"1700000000000-{i}".encode(), fields)
+                for i, fields in enumerate(client.added["stream:test"])
+            ]
+            self.assertEqual(interaction_stream.flush_interactions(), 1)
+
+        interaction = MatchingInteraction.objects.get()
+        self.assertEqual(
+            (interaction.athlete_id, interaction.coach_id, interaction.context),
+            (self.athlete.id, self.coach.id, {"rank": 1}),
+        )
+        self.assertNotIn("stream:test:dead", client.added)
+
+    def test_celery_fallback_writes_the_click(self):
+        # No Redis: the view queues the task; run it in-process
+        def run_task(*args):
+            log_matching_interaction.apply(args=args, throw=True)
+
+        with mock.patch.object(interaction_stream, "_redis", return_value=None), \
+                mock.patch.object(log_matching_interaction, "delay", side_effect=run_task):
+            self.assertEqual(self._post(self.coach.id).status_code, 201)
+
+        interaction = MatchingInteraction.objects.get()
+        self.assertEqual(
+            (interaction.athlete_id, interaction.coach_id, interaction.action),
+            (self.athlete.id, self.coach.id, "view_profile"),
+        )
+
+    def test_bad_coach_ids_are_rejected(self):
+        client = FakeStreamClient()
+        with mock.patch.object(interaction_stream, "_redis", return_value=client):
+            for coach_id in (
+                "6f1c2a9e-3b1d-4a51-9d1e-0c2f7b8a9e10",  # not a user id
+                self.coach.id + 1000,                    # no such user
+                self.athlete.id,                         # not a coach
+            ):
+                response = self._post(coach_id)
+                self.assertEqual(response.status_code, 400, coach_id)
+                self.assertIn("coach_id", response.json())
+
+        self.assertEqual(client.added, {})
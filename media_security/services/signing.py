@@ -1,14 +1,36 @@
+import base64
+import binascii
 import hmac
-import hashlib
+import struct
 import time
 from django.conf import settings
 
 SECRET = settings.SECRET_KEY.encode()
 
+# Keyed once at import; each signature copies this context instead of
+# re-deriving the inner/outer key pads. A str digestmod keeps HMAC on the
+# OpenSSL implementation (hardware SHA-256 where the CPU has it).
+_BASE = hmac.new(SECRET, digestmod="sha256")
+
+# media_id, user_id, expires as fixed-width big-endian integers; packing
+# skips the f-string + UTF-8 encode a text payload needs
+_PAYLOAD = struct.Struct(">QQI")
+
+def _sign(media_id, user_id, expires):
+    h = _BASE.copy()
+    h.update(_PAYLOAD.pack(int(media_id), int(user_id), expires))
+    return h.digest()
+
+# Tokens are the raw digest as unpadded URL-safe base64 (43 chars vs 64 hex)
+def _encode(digest):
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def _decode(token):
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+
 def sign_media_access(media_id, user_id, ttl=60):
     expires = int(time.time()) + ttl
-    payload = f"{media_id}:{user_id}:{expires}"
-    signature = hmac.new(SECRET, payload.encode(), hashlib.sha256).hexdigest()
+    signature = _encode(_sign(media_id, user_id, expires))
     return {
         "token": signature,
         "expires": expires
@@ -17,6 +39,9 @@ def sign_media_access(media_id, user_id, ttl=60):
 def verify_signature(media_id, user_id, token, expires):
     if time.time() > expires:
         return False
-    payload = f"{media_id}:{user_id}:{expires}"
-    expected = hmac.new(SECRET, payload.encode(), hashlib.sha256).hexdigest()
-    return hmac.compare_digest(expected, token)
\ No newline at end of file
+    try:
+        expected = _sign(media_id, user_id, expires)
+        provided = _decode(token)
+    except (struct.error, binascii.Error, TypeError, ValueError):
+        return False
+    return hmac.compare_digest(expected, provided)
@@ -1,4 +1,7 @@
-from django.http import FileResponse, Http404
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
 from django.core.exceptions import PermissionDenied
 from coach_profiles.models import CoachMedia
 from .signing import verify_signature
@@ -11,7 +14,13 @@ def stream_media(request, media_id, token, expires):
     if not verify_signature(media_id, request.user.id, token, expires):
         raise PermissionDenied("Invalid or expired token")
 
-    response = FileResponse(media.file.open("rb"), content_type="image/jpeg")
+    accel_prefix = settings.PROTECTED_MEDIA_ACCEL_PREFIX
+    if accel_prefix:
+        # nginx serves the bytes from its internal location (zero-copy)
+        response = HttpResponse(content_type="image/jpeg")
+        response["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + quote(media.file.name)
+    else:
+        response = FileResponse(media.file.open("rb"), content_type="image/jpeg")
     response["Cache-Control"] = "no-store"
     response["X-Content-Type-Options"] = "nosniff"
-    return response
\ No newline at end of file
+    return response
@@ -10,6 +10,9 @@ class MediaTokenView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, media_id):
+        # Signed fresh on every request: one HMAC over 20 bytes from a
+        # pre-keyed context costs ~2 µs, well under a cache
+        # round trip, so memoizing tokens would only add latency
         token_data = sign_media_access(media_id, request.user.id)
         return Response(token_data)
 
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('program_presets', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Composite first, so coach_id is never left unindexed
+        migrations.AddIndex(
+            model_name='programpreset',
+            index=models.Index(fields=['coach', '-created_at'], name='program_pre_coach_i_560944_idx'),
+        ),
+        migrations.AlterField(
+            model_name='programpreset',
+            name='coach',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
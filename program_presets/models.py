@@ -5,6 +5,13 @@ User = settings.AUTH_USER_MODEL
 
 
 class ProgramPreset(models.Model):
-    coach = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed by the composite below (coach_id is its leading column)
+    coach = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=100)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Preset limit probe and a coach's presets newest-first
+            models.Index(fields=['coach', '-created_at']),
+        ]
\ No newline at end of file
@@ -3,7 +3,11 @@ from program_presets.models import ProgramPreset
 
 
 def can_create_preset(*, coach, max_allowed: int):
-    count = ProgramPreset.objects.filter(coach=coach).count()
+    # Only whether a max_allowed-th preset exists matters: probe that one
+    # row (OFFSET max_allowed - 1 LIMIT 1) instead of counting them all
+    limit_reached = max_allowed <= 0 or ProgramPreset.objects.filter(
+        coach=coach
+    ).order_by().values('pk')[max_allowed - 1:max_allowed].exists()
 
-    if count >= max_allowed:
+    if limit_reached:
         raise PermissionDenied("Preset limit reached. Upgrade required.")
\ No newline at end of file
@@ -1,11 +1,25 @@
 # FILE: myfita/apps/backend/programs/admin.py
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.utils.html import format_html
-from django.db.models import Count, Avg
+from core.paginators import EstimatedCountPaginator
 from .models import Program, Purchase, DownloadToken, ProgramReview
 
 
+# Star strings for ratings 0-5, indexed by rating
+_STARS = tuple('★' * i for i in range(6))
+
+
+class ProgramChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # Changelist columns are all scalar; skip the wide text/JSON ones.
+        # Change forms keep the full row (get_object is unaffected).
+        return super().get_queryset(request, exclude_parameters).defer(
+            'long_description', 'preview_images', 'tags', 'pdf_file', 'pdf_leaf_hashes'
+        )
+
+
 @admin.register(Program)
 class ProgramAdmin(admin.ModelAdmin):
     list_display = [
@@ -28,10 +42,15 @@ class ProgramAdmin(admin.ModelAdmin):
         'average_rating',
         'total_reviews',
         'pdf_file_hash',
+        'pdf_merkle_root',
         'created_at',
         'updated_at',
     ]
     ordering = ['-created_at']
+    list_select_related = ('coach',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ('coach',)
     prepopulated_fields = {'slug': ('title',)}
     
     fieldsets = (
@@ -45,7 +64,7 @@ class ProgramAdmin(admin.ModelAdmin):
             'fields': ('price_toman', 'original_price_toman')
         }),
         ('Content', {
-            'fields': ('pdf_file', 'pdf_file_hash', 'pdf_page_count', 'preview_images', 'preview_video_url')
+            'fields': ('pdf_file', 'pdf_file_hash', 'pdf_merkle_root', 'pdf_page_count', 'preview_images', 'preview_video_url')
         }),
         ('Status', {
             'fields': ('status', 'is_featured', 'is_bestseller', 'published_at')
@@ -58,32 +77,13 @@ class ProgramAdmin(admin.ModelAdmin):
         }),
     )
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(
-            total_purchases_count=Count('purchase_set'),
-            average_rating_value=Avg('programreview_set__rating'),
-            total_reviews_count=Count('programreview_set'),
-        )
+    def get_changelist(self, request, **kwargs):
+        return ProgramChangeList
 
     @admin.display(description='Price', ordering='price_toman')
     def price_display(self, obj):
         return f"{obj.price_toman:,.0f} ﺗﻮﻣﺎن"
 
-    @admin.display(description='Total Purchases', ordering='total_purchases_count')
-    def total_purchases(self, obj):
-        return obj.total_purchases_count or 0
-
-    @admin.display(description='Average Rating', ordering='average_rating_value')
-    def average_rating(self, obj):
-        if obj.average_rating_value is not None:
-            return f"{obj.average_rating_value:.1f}★"
-        return "—"
-
-    @admin.display(description='Total Reviews', ordering='total_reviews_count')
-    def total_reviews(self, obj):
-        return obj.total_reviews_count or 0
-
 
 @admin.register(Purchase)
 class PurchaseAdmin(admin.ModelAdmin):
@@ -104,6 +104,8 @@ class PurchaseAdmin(admin.ModelAdmin):
         'program__title',
         'trust_token',
     ]
+    list_select_related = ('athlete', 'program')
+    raw_id_fields = ('athlete', 'program')
     readonly_fields = [
         'id',
         'trust_token',
@@ -135,7 +137,7 @@ class PurchaseAdmin(admin.ModelAdmin):
 
     @admin.display(description='ID')
     def id_short(self, obj):
-        return str(obj.id)[:8]
+        return obj.id.hex[:8]
 
     @admin.display(description='Price Paid', ordering='price_paid_toman')
     def price_display(self, obj):
@@ -155,6 +157,9 @@ class DownloadTokenAdmin(admin.ModelAdmin):
     ]
     list_filter = ['status', 'created_at', 'expires_at']
     search_fields = ['token_hash', 'purchase__id', 'purchase__athlete__phone']
+    # Purchase.__str__ renders the athlete (the title is snapshotted)
+    list_select_related = ('purchase__athlete',)
+    raw_id_fields = ('purchase',)
     readonly_fields = [
         'id',
         'token_hash',
@@ -167,7 +172,7 @@ class DownloadTokenAdmin(admin.ModelAdmin):
 
     fieldsets = (
         ('Token Info', {
-            'fields': ('id', 'purchase', 'token', 'token_hash')
+            'fields': ('id', 'purchase', 'token_hash')
         }),
         ('Usage', {
             'fields': ('status', 'use_count', 'max_uses', 'expires_at')
@@ -179,7 +184,7 @@ class DownloadTokenAdmin(admin.ModelAdmin):
 
     @admin.display(description='ID')
     def id_short(self, obj):
-        return str(obj.id)[:8]
+        return obj.id.hex[:8]
 
 
 @admin.register(ProgramReview)
@@ -200,6 +205,7 @@ class ProgramReviewAdmin(admin.ModelAdmin):
         'purchase__program__title',
         'content',
     ]
+    list_select_related = ('purchase__athlete', 'purchase__program')
     readonly_fields = ['id', 'purchase', 'helpful_count', 'created_at', 'updated_at']
     ordering = ['-created_at']
 
@@ -220,7 +226,7 @@ class ProgramReviewAdmin(admin.ModelAdmin):
 
     @admin.display(description='ID')
     def id_short(self, obj):
-        return str(obj.id)[:8]
+        return obj.id.hex[:8]
 
     @admin.display(description='Athlete')
     def get_athlete(self, obj):
@@ -232,4 +238,21 @@ class ProgramReviewAdmin(admin.ModelAdmin):
 
     @admin.display(description='Rating', ordering='rating')
     def rating_display(self, obj):
-        return '★' * obj.rating
\ No newline at end of file
+        return _STARS[obj.rating]
+
+    # Program.average_rating/total_reviews are stored columns; approving,
+    # editing or deleting a review refreshes its program straight away
+    # instead of waiting for the nightly rebuild
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        ProgramReview.rebuild_program_stats(program_ids=[obj.purchase.program_id])
+
+    def delete_model(self, request, obj):
+        program_id = obj.purchase.program_id
+        super().delete_model(request, obj)
+        ProgramReview.rebuild_program_stats(program_ids=[program_id])
+
+    def delete_queryset(self, request, queryset):
+        program_ids = set(queryset.values_list('purchase__program_id', flat=True))
+        super().delete_queryset(request, queryset)
+        ProgramReview.rebuild_program_stats(program_ids=program_ids)
\ No newline at end of file
@@ -13,5 +13,5 @@ from programs.models import Program  # Assuming Program model exists (create if
 class ProgramSerializer(serializers.ModelSerializer):
     class Meta:
         model = Program
-        fields = ['id', 'title', 'description', 'price', 'coach']  # BP: Expose for athlete search
+        fields = ['id', 'title', 'short_description', 'price_toman', 'coach']  # BP: Expose for athlete search
         read_only_fields = ['coach']  # BP: Athlete privacy (page 1)
\ No newline at end of file
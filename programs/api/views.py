@@ -7,12 +7,49 @@ BP: "coach search/filter API" (memory) - List programs for athletes.
 BP: "AI assisted matching" (page 11) - Extend later for rule-based filtering (no ML yet).
 """
 
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.relations import PrimaryKeyRelatedField
 from .serializers import ProgramSerializer
 from programs.models import Program
 
-class ProgramListView(generics.ListAPIView):
-    queryset = Program.objects.all()  # BP: Filter by athlete goals later
+class AutoPrefetchMixin:
+    """
+    Joins/prefetches the relations the serializer renders, so adding a
+    nested or string-rendered relation cannot introduce an N+1.
+    
+    A PrimaryKeyRelatedField on a forward FK reads the local *_id column
+    and is left alone; to-many relations are always prefetched.
+    """
+    
+    def get_queryset(self):
+        qs = super().get_queryset()
+        model = qs.model
+        select, prefetch = [], []
+        for field in self.get_serializer().fields.values():
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                continue  # dotted/"*" sources and serializer-only fields
+            if not model_field.is_relation:
+                continue
+            if model_field.many_to_one or model_field.one_to_one:
+                if not isinstance(field, PrimaryKeyRelatedField):
+                    select.append(field.source)
+            else:
+                prefetch.append(field.source)
+        if select:
+            qs = qs.select_related(*select)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+        return qs
+
+class ProgramListView(AutoPrefetchMixin, generics.ListAPIView):
+    # Only the serialized columns (coach renders as coach_id, no join);
+    # paginated by the DRF default (PAGE_SIZE 20)
+    queryset = Program.objects.only(
+        'id', 'title', 'short_description', 'price_toman', 'coach_id'
+    ).order_by('-created_at')  # BP: Filter by athlete goals later
     serializer_class = ProgramSerializer
     permission_classes = [IsAuthenticated]  # BP: Athlete privacy (page 1)
\ No newline at end of file
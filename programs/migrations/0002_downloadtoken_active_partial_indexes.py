@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='downloadtoken',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['token_hash'], name='dltok_hash_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='downloadtoken',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['expires_at'], name='dltok_expires_active_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0002_downloadtoken_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='pdf_leaf_hashes',
+            field=models.JSONField(default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0003_program_pdf_leaf_hashes'),
+    ]
+
+    operations = [
+        # Rows written while the model declared a comma-separated CharField
+        # hold a JSON string; split those into a JSON array of trimmed tags
+        migrations.RunSQL(
+            sql='''
+                UPDATE programs_program
+                   SET tags = to_jsonb(ARRAY(
+                           SELECT btrim(tag)
+                             FROM unnest(string_to_array(tags #>> '{}', ',')) AS tag
+                            WHERE btrim(tag) <> ''
+                       ))
+                 WHERE jsonb_typeof(tags) = 'string';
+            ''',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=GinIndex(fields=['tags'], name='program_tags_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
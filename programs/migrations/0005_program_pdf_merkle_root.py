@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0004_program_tags_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='pdf_merkle_root',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
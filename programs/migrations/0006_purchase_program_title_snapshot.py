@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0005_program_pdf_merkle_root'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='program_title_snapshot',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        # Existing purchases take the program's current title
+        migrations.RunSQL(
+            """
+            UPDATE programs_purchase AS pu
+            SET program_title_snapshot = pr.title
+            FROM programs_program AS pr
+            WHERE pr.id = pu.program_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0006_purchase_program_title_snapshot'),
+    ]
+
+    operations = [
+        # programs_download_token has no raw-token column (only the hash;
+        # DownloadToken.generate_tokens never persists the raw value), so
+        # SHA-256 keys cannot be re-keyed: outstanding links are revoked
+        # (they live minutes) and old keys shortened, staying unique, to
+        # fit the 22-char column
+        migrations.RunSQL(
+            """
+            UPDATE programs_download_token
+            SET token_hash = LEFT(token_hash, 22),
+                status = CASE WHEN status = 'active' THEN 'revoked' ELSE status END
+            WHERE LENGTH(token_hash) > 22
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='downloadtoken',
+            name='token_hash',
+            field=models.CharField(editable=False, max_length=22, unique=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0007_downloadtoken_short_token_hash'),
+    ]
+
+    operations = [
+        # Redundant with the unique index on token_hash
+        migrations.RemoveIndex(
+            model_name='downloadtoken',
+            name='dltok_hash_active_idx',
+        ),
+    ]
@@ -1,13 +1,20 @@
 # FILE: myfita/apps/backend/programs/models.py
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.text import slugify
+import base64
 import hashlib
+import hmac
 import os
+import re
+import secrets
 import uuid
+from datetime import timedelta
 
 
 def program_pdf_upload_path(instance, filename):
@@ -23,6 +30,75 @@ def program_pdf_upload_path(instance, filename):
     return os.path.join('programs', str(pk), name)
 
 
+# Leaf size for Program.pdf_leaf_hashes
+PDF_HASH_BLOCK_SIZE = 256 * 1024
+
+# Reads are 1 MiB (four leaves) so the whole-file hash gets long update()
+# bursts and fewer Python-level calls per MB; file and upload reads
+# return the full size until EOF, so leaves stay block-aligned
+PDF_HASH_READ_SIZE = 4 * PDF_HASH_BLOCK_SIZE
+
+# PDF digests stay SHA-256 from hashlib (OpenSSL, SHA-NI where the CPU
+# has it, GIL released per block): stored pdf_file_hash values keep
+# matching, and no third-party hash package is needed
+# hashlib.file_digest() is not used: it only returns the whole-file
+# digest, and the per-block leaves come from the same read pass
+
+
+def _hash_pdf_blocks(fileobj):
+    """
+    Hash a PDF in one pass: SHA-256 of the whole file (the stored
+    pdf_file_hash, unchanged) plus a SHA-256 per PDF_HASH_BLOCK_SIZE
+    block, so a tampered or edited region can be located per block.
+    """
+    file_hash = hashlib.sha256()
+    leaves = []
+    for chunk in iter(lambda: fileobj.read(PDF_HASH_READ_SIZE), b''):
+        file_hash.update(chunk)
+        view = memoryview(chunk)
+        for start in range(0, len(view), PDF_HASH_BLOCK_SIZE):
+            leaves.append(
+                hashlib.sha256(view[start:start + PDF_HASH_BLOCK_SIZE]).hexdigest()
+            )
+    return file_hash.hexdigest(), leaves
+
+
+def _merkle_root(leaves):
+    """
+    Root of a binary SHA-256 tree over hex leaf hashes; an odd node is
+    carried up unpaired. A changed block is proven against the root with
+    log2(blocks) sibling hashes instead of re-reading the file.
+    """
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    if not level:
+        return ''
+    while len(level) > 1:
+        paired = [
+            hashlib.sha256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+class ProgramQuerySet(models.QuerySet):
+    def refresh_counters(self):
+        """
+        Recompute total_purchases (paid or delivered purchases) for these
+        programs in one UPDATE; returns the number of programs updated.
+        """
+        sold = Purchase.objects.filter(
+            program=models.OuterRef('pk'), status__in=['paid', 'delivered']
+        ).order_by().values('program').annotate(c=models.Count('*')).values('c')
+        return self.update(
+            total_purchases=Coalesce(
+                models.Subquery(sold, output_field=models.PositiveIntegerField()), 0
+            )
+        )
+
+
 class Program(models.Model):
     """
     Training program created by coaches.
@@ -67,7 +143,8 @@ class Program(models.Model):
     # Classification
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, blank=True)
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES, blank=True)
-    tags = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    # List of tag strings (jsonb); filter with tags__contains=['yoga']
+    tags = models.JSONField(default=list, blank=True)
     duration_weeks = models.PositiveIntegerField(
         null=True,
         blank=True,
@@ -102,6 +179,8 @@ class Program(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=['pdf'])]
     )
     pdf_file_hash = models.CharField(max_length=64, blank=True, editable=False)
+    pdf_leaf_hashes = models.JSONField(default=list, editable=False)
+    pdf_merkle_root = models.CharField(max_length=64, blank=True, editable=False)
     pdf_page_count = models.PositiveIntegerField(null=True, blank=True)
     preview_images = models.JSONField(default=list, blank=True)
     preview_video_url = models.URLField(max_length=500, blank=True)
@@ -112,45 +191,100 @@ class Program(models.Model):
     is_bestseller = models.BooleanField(default=False)
     published_at = models.DateTimeField(null=True, blank=True)
     
+    # Denormalized statistics (search sorts/filters on these); rebuilt in
+    # batch by ProgramQuerySet.refresh_counters and
+    # ProgramReview.rebuild_program_stats
+    total_purchases = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0), MaxValueValidator(5)]
+    )
+    total_reviews = models.PositiveIntegerField(default=0)
+    total_views = models.PositiveIntegerField(default=0)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProgramQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'is_featured']),
             models.Index(fields=['coach', 'status']),
             models.Index(fields=['category', 'difficulty']),
+            # jsonb containment (`tags__contains=[...]`) uses this
+            GinIndex(fields=['tags'], opclasses=['jsonb_path_ops'], name='program_tags_gin'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # PDF name as stored, so save() can skip re-hashing an unchanged file
+        if 'pdf_file' in field_names:
+            instance._stored_pdf_name = values[field_names.index('pdf_file')]
+        return instance
+
     def save(self, *args, **kwargs):
         # Auto-generate slug from title
         if not self.slug:
             base_slug = slugify(self.title, allow_unicode=True)
+            # All taken variants (base, base-1, base-2, ...) in one query
+            used = set(Program.objects.filter(
+                slug__regex=rf'^{re.escape(base_slug)}(-[0-9]+)?$'
+            ).order_by().values_list('slug', flat=True))
             self.slug = base_slug
             counter = 1
-            while Program.objects.filter(slug=self.slug).exists():
+            while self.slug in used:
                 self.slug = f"{base_slug}-{counter}"
                 counter += 1
         
-        # Generate PDF hash if file exists
-        if self.pdf_file:
+        # Generate PDF hash for a new or replaced file (metadata-only
+        # edits keep the stored hash). A fresh upload is still the local
+        # UploadedFile at this point, so it is hashed inline before it
+        # reaches (possibly remote) storage. A path swap or a row that
+        # never got a hash would need a full read back from storage, so
+        # that is left to a worker once the row is committed
+        pdf_changed = (
+            not self.pdf_file._committed
+            or self.pdf_file.name != getattr(self, '_stored_pdf_name', None)
+        )
+        hash_in_worker = False
+        if self.pdf_file and not self.pdf_file._committed:
             try:
                 self.pdf_file.seek(0)
-                file_hash = hashlib.sha256()
-                for chunk in self.pdf_file.chunks():
-                    file_hash.update(chunk)
-                self.pdf_file_hash = file_hash.hexdigest()
+                self.pdf_file_hash, self.pdf_leaf_hashes = _hash_pdf_blocks(self.pdf_file)
+                self.pdf_merkle_root = _merkle_root(self.pdf_leaf_hashes)
+                # Rewind so the storage backend uploads from the start
+                self.pdf_file.seek(0)
             except Exception:
                 pass
+        elif self.pdf_file and (pdf_changed or not self.pdf_file_hash):
+            if pdf_changed:
+                # Never serve the previous file's hash for the new one
+                self.pdf_file_hash, self.pdf_leaf_hashes, self.pdf_merkle_root = '', [], ''
+            hash_in_worker = True
         
         super().save(*args, **kwargs)
+        self._stored_pdf_name = self.pdf_file.name
+        
+        if hash_in_worker:
+            from programs.tasks import compute_pdf_hash
+            transaction.on_commit(lambda pk=self.pk: compute_pdf_hash.delay(str(pk)))
 
     def __str__(self):
         return self.title
 
 
+class PurchaseQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join the athlete and program that purchase listings render."""
+        return self.select_related('athlete', 'program')
+
+
 class Purchase(models.Model):
     """
     Record of athlete purchasing a program.
@@ -178,6 +312,9 @@ class Purchase(models.Model):
         on_delete=models.CASCADE,
         related_name='purchase_set'
     )
+    # Title at purchase time: receipts and __str__ need no program join,
+    # and keep the name the athlete bought under if the coach renames it
+    program_title_snapshot = models.CharField(max_length=255, blank=True, default='')
     
     # Transaction details
     price_paid_toman = models.DecimalField(
@@ -212,6 +349,8 @@ class Purchase(models.Model):
     paid_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
 
+    objects = PurchaseQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -220,8 +359,63 @@ class Purchase(models.Model):
             models.Index(fields=['status', 'created_at']),
         ]
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.program_title_snapshot:
+            self.program_title_snapshot = self.program.title
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return f"Purchase #{self.pk} - {self.program.title} by {self.athlete}"
+        title = self.program_title_snapshot or self.program.title
+        return f"Purchase #{self.pk} - {title} by {self.athlete}"
+
+    def increment_download(self, ip_address=None):
+        """
+        Record one download in a single UPDATE: the counter is bumped with
+        F() so concurrent downloads cannot lose increments, and the first
+        download of a paid purchase marks it delivered.
+
+        The instance is not refreshed; call refresh_from_db() if the new
+        counter or status is needed.
+        """
+        now = timezone.now()
+        first_download = models.Q(status='paid')
+        Purchase.objects.filter(pk=self.pk).update(
+            download_count=models.F('download_count') + 1,
+            last_downloaded_at=now,
+            last_download_ip=ip_address or None,
+            status=models.Case(
+                models.When(first_download, then=models.Value('delivered')),
+                default=models.F('status'),
+            ),
+            delivered_at=models.Case(
+                models.When(first_download, then=models.Value(now)),
+                default=models.F('delivered_at'),
+            ),
+        )
+
+
+def _hash_download_token(raw_token):
+    """
+    Lookup key for a raw download token: HMAC-SHA256 under SECRET_KEY,
+    truncated to 128 bits and base64url-encoded (22 chars). Tokens are
+    random and unguessable, so 128 bits is ample for a unique key, and the
+    short key keeps the token_hash indexes dense.
+    """
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(), raw_token.encode('utf-8'), hashlib.sha256
+    ).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+class DownloadTokenQuerySet(models.QuerySet):
+    def valid(self):
+        """Tokens that pass DownloadToken.is_valid(), filtered in SQL."""
+        return self.filter(
+            status='active',
+            use_count__lt=models.F('max_uses'),
+        ).filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gte=timezone.now())
+        )
 
 
 class DownloadToken(models.Model):
@@ -245,9 +439,8 @@ class DownloadToken(models.Model):
         related_name='download_tokens'
     )
     
-    # Token data
-    token = models.CharField(max_length=255, unique=True, default='')
-    token_hash = models.CharField(max_length=64, editable=False, db_index=True)
+    # Only the hash is stored; the raw token exists in the download URL
+    token_hash = models.CharField(max_length=22, unique=True, editable=False)
     
     # Usage tracking
     use_count = models.PositiveIntegerField(default=0)
@@ -262,22 +455,108 @@ class DownloadToken(models.Model):
     used_from_ip = models.GenericIPAddressField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = DownloadTokenQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['token_hash']),
             models.Index(fields=['status', 'expires_at']),
             models.Index(fields=['purchase', 'status']),
+            # Expiry sweeps only look at active tokens; the partial index
+            # leaves used/expired/revoked rows out. Lookups by token_hash
+            # use its unique index.
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='active'),
+                name='dltok_expires_active_idx',
+            ),
         ]
 
-    def save(self, *args, **kwargs):
-        # Generate token hash
-        if self.token:
-            self.token_hash = hashlib.sha256(self.token.encode('utf-8')).hexdigest()
-        super().save(*args, **kwargs)
+    @classmethod
+    def generate_tokens(cls, purchase, count, expires_in_minutes=None, max_uses=1):
+        """
+        Mint `count` tokens for a purchase with one INSERT.
+        
+        Only token_hash is stored; the raw tokens are returned once, for
+        the download URLs. Ids come from the UUID default, so nothing has
+        to be read back.
+        
+        Returns [(token, raw_token), ...].
+        """
+        expires_at = None
+        if expires_in_minutes:
+            expires_at = timezone.now() + timedelta(minutes=expires_in_minutes)
+        raw_tokens = [secrets.token_urlsafe(32) for _ in range(count)]
+        tokens = [
+            cls(
+                purchase=purchase,
+                token_hash=_hash_download_token(raw),
+                max_uses=max_uses,
+                expires_at=expires_at,
+            )
+            for raw in raw_tokens
+        ]
+        cls.objects.bulk_create(tokens, batch_size=500)
+        return list(zip(tokens, raw_tokens))
+
+    @classmethod
+    def generate_token(cls, purchase, expires_in_minutes=None, max_uses=1):
+        """Mint one token; returns (token, raw_token)."""
+        return cls.generate_tokens(purchase, 1, expires_in_minutes, max_uses)[0]
+
+    @classmethod
+    def validate_token(cls, raw_token, ip_address=None):
+        """
+        Validate a raw download token and consume one use of it.
+        
+        Every check (active, unexpired, uses left) is in the WHERE of one
+        UPDATE, so two concurrent downloads cannot both take the last use;
+        the last use flips the status to 'used' in the same statement.
+        The token row is only read back on success (with the purchase and
+        program the download needs), or to classify a rejection.
+        
+        Returns (True, token) or (False, error message).
+        """
+        token_hash = _hash_download_token(raw_token)
+        with transaction.atomic():
+            consumed = cls.objects.valid().filter(token_hash=token_hash).update(
+                use_count=models.F('use_count') + 1,
+                used_at=timezone.now(),
+                used_from_ip=ip_address or None,
+                status=models.Case(
+                    models.When(
+                        use_count__gte=models.F('max_uses') - 1,
+                        then=models.Value('used'),
+                    ),
+                    default=models.Value('active'),
+                ),
+            )
+            if consumed:
+                # Just the columns the download path reads: no program
+                # description/preview/JSON payload per request
+                return True, cls.objects.select_related(
+                    'purchase__program'
+                ).only(
+                    'purchase__athlete_id',
+                    'purchase__download_count',
+                    'purchase__program__title',
+                    'purchase__program__pdf_file',
+                    'purchase__program__pdf_file_hash',
+                ).get(token_hash=token_hash)
+        
+        token = cls.objects.filter(token_hash=token_hash).only(
+            'status', 'expires_at', 'use_count', 'max_uses'
+        ).first()
+        if token is None:
+            return False, 'Invalid token'
+        if token.status == 'revoked':
+            return False, 'Token revoked'
+        if token.expires_at and timezone.now() > token.expires_at:
+            return False, 'Token expired'
+        return False, 'Token already used'
 
     def is_valid(self):
-        """Check if token is still valid for use."""
+        """Check if token is still valid for use (see DownloadTokenQuerySet.valid)."""
         if self.status != 'active':
             return False
         if self.expires_at and timezone.now() > self.expires_at:
@@ -330,5 +609,36 @@ class ProgramReview(models.Model):
         ]
         unique_together = [['purchase']]  # One review per purchase
 
+    @classmethod
+    def rebuild_program_stats(cls, program_ids=None):
+        """
+        Recompute Program.average_rating and total_reviews from approved
+        reviews in one UPDATE (all programs, or just `program_ids`).
+        Returns the number of programs updated.
+        """
+        approved = cls.objects.filter(
+            purchase__program=models.OuterRef('pk'), is_approved=True
+        ).order_by().values('purchase__program')
+        
+        programs = Program.objects.all()
+        if program_ids is not None:
+            programs = programs.filter(pk__in=program_ids)
+        return programs.update(
+            average_rating=Coalesce(
+                models.Subquery(
+                    approved.annotate(a=models.Avg('rating')).values('a'),
+                    output_field=models.DecimalField(max_digits=3, decimal_places=2),
+                ),
+                0,
+            ),
+            total_reviews=Coalesce(
+                models.Subquery(
+                    approved.annotate(c=models.Count('*')).values('c'),
+                    output_field=models.PositiveIntegerField(),
+                ),
+                0,
+            ),
+        )
+
     def __str__(self):
         return f"Review #{self.pk} - {self.purchase.program.title} ({self.rating}★)"
\ No newline at end of file
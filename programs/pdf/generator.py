@@ -1,9 +1,16 @@
 from weasyprint import HTML
+from django.core.files import File
 from django.template.loader import render_to_string
+from programs.services.pdf_service import FONT_CONFIG
 from .watermark import apply_watermark
-import tempfile
+import hashlib
+from io import BytesIO
 
 def generate_program_pdf(*, athlete, coach, program_data, order_id):
+    """
+    Render and watermark a program PDF in memory; returns (file, sha256 hex).
+    The file is unsaved, so assigning it to a FileField writes it to storage.
+    """
     html = render_to_string("programs/program_pdf.html", {
         "athlete": athlete,
         "coach": coach,
@@ -11,13 +18,17 @@ def generate_program_pdf(*, athlete, coach, program_data, order_id):
         "order_id": order_id,
     })
 
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    HTML(string=html).write_pdf(tmp.name)
+    buf = BytesIO()
+    HTML(string=html).write_pdf(target=buf, font_config=FONT_CONFIG)
 
     apply_watermark(
-        pdf_path=tmp.name,
+        pdf=buf,
         athlete=athlete,
         order_id=order_id
     )
 
-    return tmp.name
\ No newline at end of file
+    # Hashed once here, after the last write, for every delivery path
+    pdf_hash = hashlib.sha256(buf.getbuffer()).hexdigest()
+    buf.seek(0)
+
+    return File(buf, name=f"{order_id}.pdf"), pdf_hash
@@ -1,8 +1,14 @@
 import hashlib
 
-def apply_watermark(*, pdf_path, athlete, order_id):
-    fingerprint = hashlib.sha256(
-        f"{athlete.id}:{order_id}".encode()
+from django.conf import settings
+
+# blake2b keys are capped at 64 bytes; a digest of the setting always fits
+_KEY = hashlib.sha256(settings.WATERMARK_KEY.encode()).digest()
+
+def apply_watermark(*, pdf, athlete, order_id):
+    # Keyed, so a fingerprint cannot be forged from the public ids alone
+    fingerprint = hashlib.blake2b(
+        f"{athlete.id}:{order_id}".encode(), key=_KEY, digest_size=32
     ).hexdigest()
 
     # (Invisible watermark placeholder)
@@ -64,7 +64,6 @@ class PDFDeliveryService:
     DEFAULT_TOKEN_EXPIRY_MINUTES = 30
     DEFAULT_MAX_USES = 1
     MAX_DOWNLOADS_PER_PURCHASE = 5
-    ENABLE_IP_BINDING = False  # Set True for stricter security
 
     def generate_download_token(
         self,
@@ -126,16 +125,12 @@ class PDFDeliveryService:
         
         # Get request metadata
         client_ip = self._get_client_ip(request)
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
         
         # Generate token
-        bind_ip = client_ip if self.ENABLE_IP_BINDING else None
         token, raw_token = DownloadToken.generate_token(
             purchase=purchase,
             expires_in_minutes=expires_in,
             max_uses=max_uses,
-            bind_ip=bind_ip,
-            user_agent=user_agent
         )
         
         # Build download URL
@@ -170,9 +165,8 @@ class PDFDeliveryService:
         """
         
         client_ip = self._get_client_ip(request)
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # Validate token
+        # Validate token (consumes one use atomically)
         is_valid, token_or_error = DownloadToken.validate_token(raw_token, client_ip)
         
         if not is_valid:
@@ -206,11 +200,9 @@ class PDFDeliveryService:
                     error_code='INTEGRITY_ERROR'
                 )
         
-        # Mark token as used
-        token.mark_used(ip_address=client_ip, user_agent=user_agent)
-        
         # Increment purchase download count
         purchase.increment_download(ip_address=client_ip)
+        purchase.refresh_from_db(fields=['download_count'])
         
         # Log successful download
         self._log_download_success(purchase, client_ip)
@@ -20,6 +20,94 @@ except ImportError:
     WEASYPRINT_AVAILABLE = False
     print("⚠️ WeasyPrint not installed. PDF generation will be disabled.")
 
+# Page and layout rules shared by every program PDF (the per-athlete
+# footer is added in PDFService._render_pdf)
+BASE_CSS_RULES = """
+@page {
+    size: A4;
+    margin: 2cm;
+    
+    @bottom-center {
+        font-size: 8pt;
+        color: #999;
+    }
+    
+    @top-right {
+        content: "MY-FITA";
+        font-size: 8pt;
+        color: #999;
+    }
+}
+
+body {
+    font-family: 'Vazir', 'Tahoma', sans-serif;
+    direction: rtl;
+    text-align: right;
+    line-height: 1.8;
+}
+
+.watermark {
+    position: fixed;
+    top: 50%;
+    left: 50%;
+    transform: translate(-50%, -50%) rotate(-45deg);
+    font-size: 60pt;
+    color: rgba(0, 0, 0, 0.03);
+    z-index: -1;
+    white-space: nowrap;
+}
+
+h1 {
+    color: #2c3e50;
+    border-bottom: 2px solid #3498db;
+    padding-bottom: 10px;
+}
+
+h2 {
+    color: #34495e;
+    margin-top: 20px;
+}
+
+.week-section {
+    background: #f8f9fa;
+    padding: 15px;
+    margin: 10px 0;
+    border-radius: 8px;
+}
+
+.exercise {
+    background: white;
+    padding: 10px;
+    margin: 5px 0;
+    border-right: 3px solid #3498db;
+}
+
+table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 15px 0;
+}
+
+th, td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: right;
+}
+
+th {
+    background: #3498db;
+    color: white;
+}
+"""
+
+# Parsed once per worker: font discovery and CSS parsing are most of
+# WeasyPrint's cost for a small document
+if WEASYPRINT_AVAILABLE:
+    from weasyprint.text.fonts import FontConfiguration
+    
+    FONT_CONFIG = FontConfiguration()
+    BASE_CSS = CSS(string=BASE_CSS_RULES, font_config=FONT_CONFIG)
+
 
 @dataclass
 class PDFGenerationResult:
@@ -162,89 +250,20 @@ class PDFService:
         Render HTML to PDF with watermark.
         """
         
-        # CSS for watermark and styling
-        watermark_css = CSS(string=f"""
+        # Only the footer names the athlete; the shared rules are parsed once
+        athlete_css = CSS(string=f"""
             @page {{
-                size: A4;
-                margin: 2cm;
-                
                 @bottom-center {{
                     content: "اختصاصی برای {athlete.get_full_name() or athlete.phone}";
-                    font-size: 8pt;
-                    color: #999;
-                }}
-                
-                @top-right {{
-                    content: "MY-FITA";
-                    font-size: 8pt;
-                    color: #999;
                 }}
             }}
-            
-            body {{
-                font-family: 'Vazir', 'Tahoma', sans-serif;
-                direction: rtl;
-                text-align: right;
-                line-height: 1.8;
-            }}
-            
-            .watermark {{
-                position: fixed;
-                top: 50%;
-                left: 50%;
-                transform: translate(-50%, -50%) rotate(-45deg);
-                font-size: 60pt;
-                color: rgba(0, 0, 0, 0.03);
-                z-index: -1;
-                white-space: nowrap;
-            }}
-            
-            h1 {{
-                color: #2c3e50;
-                border-bottom: 2px solid #3498db;
-                padding-bottom: 10px;
-            }}
-            
-            h2 {{
-                color: #34495e;
-                margin-top: 20px;
-            }}
-            
-            .week-section {{
-                background: #f8f9fa;
-                padding: 15px;
-                margin: 10px 0;
-                border-radius: 8px;
-            }}
-            
-            .exercise {{
-                background: white;
-                padding: 10px;
-                margin: 5px 0;
-                border-right: 3px solid #3498db;
-            }}
-            
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin: 15px 0;
-            }}
-            
-            th, td {{
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: right;
-            }}
-            
-            th {{
-                background: #3498db;
-                color: white;
-            }}
-        """)
+        """, font_config=FONT_CONFIG)
         
         # Generate PDF
         html = HTML(string=html_content)
-        pdf_bytes = html.write_pdf(stylesheets=[watermark_css])
+        pdf_bytes = html.write_pdf(
+            stylesheets=[BASE_CSS, athlete_css], font_config=FONT_CONFIG
+        )
         
         return pdf_bytes
     
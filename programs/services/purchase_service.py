@@ -224,8 +224,8 @@ class PurchaseService:
         return list(
             Purchase.objects.filter(
                 athlete_id=athlete_id
-            ).select_related(
-                'program', 'program__coach'
+            ).with_related().select_related(
+                'program__coach'
             ).order_by('-created_at')
         )
 
@@ -235,7 +235,5 @@ class PurchaseService:
             Purchase.objects.filter(
                 program__coach_id=coach_id,
                 status__in=[Purchase.Status.PAID, Purchase.Status.DELIVERED]
-            ).select_related(
-                'program', 'athlete'
-            ).order_by('-created_at')
+            ).with_related().order_by('-created_at')
         )
\ No newline at end of file
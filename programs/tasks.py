@@ -0,0 +1,46 @@
+# FILE: myfita/apps/backend/programs/tasks.py
+
+"""
+PROGRAM BACKGROUND TASKS
+"""
+
+from celery import shared_task
+from django.db import OperationalError
+
+from programs.models import Program, ProgramReview, _hash_pdf_blocks, _merkle_root
+
+
+@shared_task(
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def compute_pdf_hash(program_id):
+    """Hash a program PDF that is already in storage, off the request path"""
+    program = Program.objects.only('pdf_file').filter(pk=program_id).first()
+    if program is None or not program.pdf_file:
+        return
+    
+    with program.pdf_file.open('rb') as pdf:
+        file_hash, leaves = _hash_pdf_blocks(pdf)
+    
+    # update() rather than save(): no slug/hash logic re-entered, and the
+    # name filter drops the result if the file was replaced meanwhile
+    Program.objects.filter(pk=program_id, pdf_file=program.pdf_file.name).update(
+        pdf_file_hash=file_hash,
+        pdf_leaf_hashes=leaves,
+        pdf_merkle_root=_merkle_root(leaves),
+    )
+
+
+@shared_task(
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def rebuild_program_stats():
+    """Nightly re-aggregation of the denormalized program statistics"""
+    Program.objects.refresh_counters()
+    return ProgramReview.rebuild_program_stats()
@@ -0,0 +1,145 @@
+# FILE: myfita/apps/backend/programs/tests.py
+
+import hashlib
+import io
+import threading
+from datetime import timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from programs.models import (
+    PDF_HASH_BLOCK_SIZE,
+    DownloadToken,
+    Program,
+    Purchase,
+    _hash_pdf_blocks,
+    _merkle_root,
+)
+from users.models import User
+
+
+def _sha(data):
+    return hashlib.sha256(data).digest()
+
+
+class PdfMerkleRootTests(SimpleTestCase):
+    def test_empty_file_has_no_root(self):
+        self.assertEqual(_merkle_root([]), '')
+
+    def test_single_leaf_is_the_root(self):
+        leaf = _sha(b'a').hex()
+        self.assertEqual(_merkle_root([leaf]), leaf)
+
+    def test_pairs_and_odd_leaf_carried_up(self):
+        a, b, c = _sha(b'a'), _sha(b'b'), _sha(b'c')
+        self.assertEqual(_merkle_root([a.hex(), b.hex()]), _sha(a + b).hex())
+        # c has no sibling on the first level and is paired one level up
+        self.assertEqual(
+            _merkle_root([a.hex(), b.hex(), c.hex()]), _sha(_sha(a + b) + c).hex()
+        )
+
+    def test_changed_block_changes_root(self):
+        data = bytearray(b'x' * (PDF_HASH_BLOCK_SIZE * 3 + 10))
+        _, leaves = _hash_pdf_blocks(io.BytesIO(bytes(data)))
+        data[PDF_HASH_BLOCK_SIZE + 5] = ord('y')
+        _, tampered = _hash_pdf_blocks(io.BytesIO(bytes(data)))
+
+        self.assertEqual(len(leaves), 4)
+        self.assertEqual([i for i in range(4) if leaves[i] != tampered[i]], [1])
+        self.assertNotEqual(_merkle_root(leaves), _merkle_root(tampered))
+
+    def test_file_hash_is_plain_sha256(self):
+        data = b'%PDF-1.7' * 100_000
+        file_hash, _ = _hash_pdf_blocks(io.BytesIO(data))
+        self.assertEqual(file_hash, hashlib.sha256(data).hexdigest())
+
+
+def _make_purchase():
+    coach = User.objects.create_user(phone="09120000101", role="coach")
+    athlete = User.objects.create_user(phone="09120000102", role="athlete")
+    program = Program.objects.create(coach=coach, title="Strength Basics")
+    return Purchase.objects.create(
+        athlete=athlete, program=program, price_paid_toman=100_000, status="paid"
+    )
+
+
+class DownloadTokenValidateTests(TestCase):
+    def setUp(self):
+        self.purchase = _make_purchase()
+
+    def test_single_use_token_is_exhausted(self):
+        token, raw = DownloadToken.generate_token(self.purchase, max_uses=1)
+
+        ok, validated = DownloadToken.validate_token(raw, "10.0.0.1")
+        self.assertTrue(ok)
+        self.assertEqual(validated.pk, token.pk)
+        self.assertEqual(validated.purchase.program.title, "Strength Basics")
+
+        token.refresh_from_db()
+        self.assertEqual(token.use_count, 1)
+        self.assertEqual(token.status, "used")
+        self.assertEqual(token.used_from_ip, "10.0.0.1")
+
+        self.assertEqual(
+            DownloadToken.validate_token(raw), (False, "Token already used")
+        )
+
+    def test_multi_use_token_flips_on_last_use(self):
+        token, raw = DownloadToken.generate_token(self.purchase, max_uses=2)
+
+        self.assertTrue(DownloadToken.validate_token(raw)[0])
+        token.refresh_from_db()
+        self.assertEqual((token.use_count, token.status), (1, "active"))
+
+        self.assertTrue(DownloadToken.validate_token(raw)[0])
+        token.refresh_from_db()
+        self.assertEqual((token.use_count, token.status), (2, "used"))
+
+        self.assertFalse(DownloadToken.validate_token(raw)[0])
+
+    def test_expired_token(self):
+        token, raw = DownloadToken.generate_token(self.purchase, expires_in_minutes=30)
+        DownloadToken.objects.filter(pk=token.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(DownloadToken.validate_token(raw), (False, "Token expired"))
+        token.refresh_from_db()
+        self.assertEqual(token.use_count, 0)
+
+    def test_revoked_token(self):
+        token, raw = DownloadToken.generate_token(self.purchase)
+        DownloadToken.objects.filter(pk=token.pk).update(status="revoked")
+
+        self.assertEqual(DownloadToken.validate_token(raw), (False, "Token revoked"))
+
+    def test_unknown_token(self):
+        self.assertEqual(
+            DownloadToken.validate_token("not-a-token"), (False, "Invalid token")
+        )
+
+
+class DownloadTokenConcurrencyTests(TransactionTestCase):
+    def test_concurrent_consumes_of_single_use_token(self):
+        _, raw = DownloadToken.generate_token(_make_purchase(), max_uses=1)
+        barrier = threading.Barrier(2)
+        results = []
+
+        def consume():
+            try:
+                barrier.wait()
+                results.append(DownloadToken.validate_token(raw)[0])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=consume) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), [False, True])
+        token = DownloadToken.objects.get()
+        self.assertEqual((token.use_count, token.status), (1, "used"))
@@ -23,7 +23,11 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExampl
 from django.utils import timezone
 
 from search.models import SearchLog, SavedSearch
-from search.services.search_service import CoachSearchService, ProgramSearchService
+from search.services.search_service import (
+    CoachSearchService,
+    ProgramSearchService,
+    get_popular_searches,
+)
 from search.services.filter_service import FilterService
 from search.api.serializers import (
     SearchRequestSerializer,
@@ -558,25 +562,7 @@ class PopularSearchesView(APIView):
         ]
     )
     def get(self, request):
-        from search.models import SearchQuery
-        
         limit = min(int(request.query_params.get("limit", 10)), 20)
         category = request.query_params.get("category", "")
         
-        queryset = SearchQuery.objects.filter(
-            search_count__gte=5  # Minimum searches to be "popular"
-        ).order_by("-search_count")
-        
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        queries = queryset[:limit]
-        
-        return Response([
-            {
-                "query": q.query_text,
-                "count": q.search_count,
-                "category": q.category
-            }
-            for q in queries
-        ])
\ No newline at end of file
+        return Response(get_popular_searches(category=category, limit=limit))
@@ -21,6 +21,8 @@ from dataclasses import dataclass, field
 from decimal import Decimal
 from django.db.models import Q, F, Count, Avg, Min, Max
 from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
 from users.models import User
@@ -763,4 +765,61 @@ class ProgramSearchService:
             "has_discount": {
                 "type": "boolean"
             }
-        }
\ No newline at end of file
+        }
+
+
+# =============================================================================
+# POPULAR SEARCHES
+# =============================================================================
+
+POPULAR_SEARCH_LIMIT = 20
+
+
+def refresh_popular_searches() -> Dict[str, List[Dict]]:
+    """
+    Recompute popular searches and store them in the cache.
+    
+    Runs from the `refresh_popular_searches` periodic task so the API
+    never aggregates SearchQuery rows on the request path. The cached
+    value maps category -> rows, with "" holding the overall ranking.
+    """
+    config = settings.SEARCH_CONFIG
+    base = SearchQuery.objects.filter(
+        search_count__gte=config["POPULAR_SEARCH_MIN_COUNT"]
+    ).order_by("-search_count")
+    
+    def _rows(queryset):
+        return [
+            {
+                "query": row["query_text"],
+                "count": row["search_count"],
+                "category": row["category"],
+            }
+            for row in queryset.values(
+                "query_text", "search_count", "category"
+            )[:POPULAR_SEARCH_LIMIT]
+        ]
+    
+    popular = {"": _rows(base)}
+    categories = base.exclude(category="").order_by().values_list(
+        "category", flat=True
+    ).distinct()
+    for category in categories:
+        popular[category] = _rows(base.filter(category=category))
+    
+    # Outlive the refresh interval so a late beat run never empties the key
+    cache.set(
+        config["POPULAR_CACHE_KEY"],
+        popular,
+        timeout=config["POPULAR_REFRESH_SECONDS"] * 2,
+    )
+    return popular
+
+
+def get_popular_searches(category: str = "", limit: int = 10) -> List[Dict]:
+    """Return cached popular searches, rebuilding only on a cold cache"""
+    
+    popular = cache.get(settings.SEARCH_CONFIG["POPULAR_CACHE_KEY"])
+    if popular is None:
+        popular = refresh_popular_searches()
+    return popular.get(category, [])[:limit]
@@ -0,0 +1,16 @@
+# FILE: myfita/apps/backend/search/tasks.py
+
+"""
+SEARCH BACKGROUND TASKS
+"""
+
+from celery import shared_task
+
+from search.services.search_service import refresh_popular_searches as _refresh
+
+
+@shared_task
+def refresh_popular_searches():
+    """Rebuild the cached popular-searches ranking (Celery beat)"""
+    popular = _refresh()
+    return len(popular.get("", []))